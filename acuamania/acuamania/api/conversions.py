@@ -1,6 +1,8 @@
 import frappe
 from frappe.utils import today
 
+from acuamania.acuamania.promo_engine.engine import carry_pricing
+
 
 def _insert_and_return(doc):
 	"""
@@ -90,6 +92,9 @@ def make_sales_order_and_insert(source_name, target_doc=None):
 	Create and insert Sales Order from Quotation.
 
 	Same signature as erpnext.selling.doctype.quotation.quotation.make_sales_order
+
+	The Quotation's promotions and pricing fingerprint are carried over, so
+	the promo engine does not re-price an unchanged order.
 	"""
 	if not frappe.db.exists("Quotation", source_name):
 		frappe.throw(f"Quotation '{source_name}' does not exist.")
@@ -100,5 +105,10 @@ def make_sales_order_and_insert(source_name, target_doc=None):
 		target_doc=target_doc,
 	)
 
+	if doc and not target_doc:
+		if isinstance(doc, dict):
+			doc = frappe.get_doc(doc)
+		carry_pricing(frappe.get_doc("Quotation", source_name), doc)
+
 	sales_order = _insert_and_return(doc)
 	return sales_order.name
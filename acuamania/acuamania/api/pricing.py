@@ -0,0 +1,168 @@
+import frappe
+from frappe import _
+from frappe.utils import cstr, flt, getdate, today
+
+from acuamania.acuamania.promo_engine.active_promotions import get_active_promotion_index
+from acuamania.acuamania.promo_engine.core import price_cart as price_engine_cart
+from acuamania.acuamania.promo_engine.engine import (
+	build_cart,
+	get_default_promotions,
+	get_group_promotion_if_applicable,
+	load_promo,
+)
+from acuamania.acuamania.promo_engine.item_groups import get_item_group_map
+from acuamania.acuamania.promo_engine.item_prices import get_default_selling_price_list, get_item_rates
+from acuamania.acuamania.promo_engine.policy import get_pricing_policy
+from acuamania.acuamania.promo_engine.redemptions import is_promotion_exhausted
+
+
+@frappe.whitelist()
+def price_cart(
+	items,
+	promotions=None,
+	customer_category=None,
+	transaction_date=None,
+	price_list=None,
+	customer=None,
+	contact=None,
+):
+	"""
+	Quotes a cart with the promo engine without creating any document.
+
+	    items: [{"item_code": "ENTR-GRAL", "qty": 2}, ...] (rate is optional,
+	        the selling price list rate is used otherwise)
+	    promotions: optional list of Park Promotion names
+	    customer_category: a Customer Category or a list of them
+	    customer / contact: the buyer, whose categories are added to the
+	        given ones (audience promotions)
+
+	The promotions a Quotation would add on its own (group-discount tier,
+	default promotions) are added too. Prices come from the cached price
+	list; taxes are not computed.
+	"""
+	items = frappe.parse_json(items) if isinstance(items, str) else items
+	promotions = frappe.parse_json(promotions) if isinstance(promotions, str) else promotions
+	customer_categories = parse_customer_categories(customer_category)
+
+	if not items:
+		frappe.throw(_("Debe indicar los ítems a cotizar."))
+
+	transaction_date = cstr(getdate(transaction_date or today()))
+	price_list = price_list or get_default_selling_price_list()
+
+	quote = build_quote(items, transaction_date, price_list)
+	if customer:
+		quote.quotation_to = "Customer"
+		quote.party_name = customer
+	if contact:
+		quote.contact_person = contact
+	for category in customer_categories:
+		quote.append("custom_customer_category", {"customer_category": category})
+	item_groups = get_item_group_map(row.item_code for row in quote.items)
+
+	unknown_items = sorted({row.item_code for row in quote.items} - set(item_groups))
+	if unknown_items:
+		frappe.throw(_("Los siguientes ítems no existen: {0}").format(", ".join(unknown_items)))
+
+	promo_names = get_quote_promotions(quote, item_groups, promotions or [])
+	valid_promotions = get_active_promotion_index().valid_on(transaction_date)
+
+	cart = build_cart(quote, item_groups)
+
+	promotions = [load_promo(name) if name in valid_promotions else None for name in promo_names]
+	promotions = [None if is_promotion_exhausted(promo) else promo for promo in promotions]
+
+	result = price_engine_cart(cart, promotions, **get_pricing_policy())
+
+	total = sum(flt(row.qty) * flt(row.rate) for row in quote.items)
+	discount = flt(result.total_discount, 2)
+
+	return {
+		"transaction_date": transaction_date,
+		"price_list": price_list,
+		"customer_categories": sorted(cart.customer_categories),
+		"items": [
+			{
+				"item_code": row.item_code,
+				"qty": flt(row.qty),
+				"rate": flt(row.rate, 2),
+				"amount": flt(flt(row.qty) * flt(row.rate), 2),
+				"discount": flt(line_discount, 2),
+			}
+			for row, line_discount in zip(quote.items, result.line_discounts, strict=True)
+		],
+		"promotions": [
+			{
+				"promotion": name,
+				"applied_name": promotion_result.applied_name,
+				"discount": flt(promotion_result.discount, 2),
+				"qty": promotion_result.qty,
+			}
+			for name, promotion_result in zip(promo_names, result.promotions, strict=True)
+		],
+		"total": flt(total, 2),
+		"discount": discount,
+		"grand_total": flt(total - discount, 2),
+	}
+
+
+def parse_customer_categories(customer_category):
+	if not customer_category:
+		return []
+
+	if isinstance(customer_category, str) and customer_category.lstrip().startswith("["):
+		customer_category = frappe.parse_json(customer_category)
+
+	if isinstance(customer_category, str):
+		return [customer_category]
+
+	return [category for category in customer_category if category]
+
+
+def build_quote(items, transaction_date, price_list):
+	"""
+	Unsaved Quotation with the requested lines, rated from the price list
+	when no rate is given. Throws for items without a price.
+	"""
+	rows = [
+		frappe._dict(item_code=row.get("item_code"), qty=flt(row.get("qty")), rate=row.get("rate"))
+		for row in items
+		if row.get("item_code") and flt(row.get("qty")) > 0
+	]
+
+	if not rows:
+		frappe.throw(_("Debe indicar al menos un ítem con item_code y cantidad mayor a 0."))
+
+	rates = get_item_rates([row.item_code for row in rows if row.rate is None], price_list, transaction_date)
+
+	for row in rows:
+		if row.rate is None:
+			if row.item_code not in rates:
+				frappe.throw(
+					_("El ítem {0} no tiene precio en la lista {1}.").format(row.item_code, price_list)
+				)
+			row.rate = rates[row.item_code]
+
+	quote = frappe.new_doc("Quotation")
+	quote.transaction_date = transaction_date
+	quote.selling_price_list = price_list
+
+	for row in rows:
+		quote.append("items", {"item_code": row.item_code, "qty": row.qty, "rate": flt(row.rate)})
+
+	return quote
+
+
+def get_quote_promotions(quote, item_groups, selected):
+	"""
+	Selected promotions followed by the ones the engine adds automatically,
+	without duplicates (same order as on a saved Quotation).
+	"""
+	promo_names = []
+	automatic = [get_group_promotion_if_applicable(quote, item_groups), *get_default_promotions(quote)]
+
+	for name in [*selected, *automatic]:
+		if name and name not in promo_names:
+			promo_names.append(name)
+
+	return promo_names
@@ -106,6 +106,7 @@ class TestConversionEndpoints(FrappeTestCase):
 			row.delivery_date = today()
 			row.schedule_date = today()
 
+		self.quotation.append("custom_promotion_table", {"promotion": "Descuento 10%"})
 		self.quotation.save(ignore_permissions=True)
 
 		# --------------------------------------------------
@@ -128,3 +129,13 @@ class TestConversionEndpoints(FrappeTestCase):
 		self.assertTrue(
 			self.sales_order.delivery_date or any(row.delivery_date for row in self.sales_order.items)
 		)
+
+		# --------------------------------------------------
+		# Promotions and pricing travel with the Sales Order
+		# --------------------------------------------------
+		self.assertEqual(
+			[(row.promotion, row.discount) for row in self.sales_order.custom_promotion_table],
+			[(row.promotion, row.discount) for row in self.quotation.custom_promotion_table],
+		)
+		self.assertEqual(self.sales_order.discount_amount, self.quotation.discount_amount)
+		self.assertEqual(self.sales_order.custom_promo_fingerprint, self.quotation.custom_promo_fingerprint)
@@ -0,0 +1,42 @@
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from acuamania.acuamania.api.pricing import price_cart
+
+
+class TestPriceCartEndpoint(FrappeTestCase):
+	"""
+	The bot quote endpoint prices with the promo engine and writes nothing.
+	"""
+
+	def test_quote_with_promotion_does_not_insert_documents(self):
+		quotations_before = frappe.db.count("Quotation")
+
+		quote = price_cart(
+			items=[{"item_code": "ENTR-GRAL", "qty": 2, "rate": 1000}],
+			promotions=["Descuento 10%"],
+		)
+
+		self.assertEqual(quote["total"], 2000)
+		self.assertEqual(quote["discount"], 200)
+		self.assertEqual(quote["grand_total"], 1800)
+		self.assertEqual(quote["promotions"][0]["applied_name"], "Descuento 10%")
+		self.assertEqual(frappe.db.count("Quotation"), quotations_before)
+
+	def test_rates_come_from_price_list(self):
+		rate = frappe.db.get_value(
+			"Item Price",
+			{"item_code": "ENTR-GRAL", "price_list": "Standard Selling", "selling": 1},
+			"price_list_rate",
+		)
+		if rate is None:
+			self.skipTest("ENTR-GRAL has no Standard Selling price")
+
+		quote = price_cart(items='[{"item_code": "ENTR-GRAL", "qty": 3}]', price_list="Standard Selling")
+
+		self.assertEqual(quote["items"][0]["rate"], rate)
+		self.assertEqual(quote["total"], rate * 3)
+
+	def test_unknown_item(self):
+		with self.assertRaises(frappe.ValidationError):
+			price_cart(items=[{"item_code": "NO-EXISTE-XYZ", "qty": 1, "rate": 10}])
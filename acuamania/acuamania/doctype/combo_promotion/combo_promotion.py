@@ -4,6 +4,37 @@
 # import frappe
 from frappe.model.document import Document
 
+from acuamania.acuamania.promo_engine.promotion_cache import (
+	clear_promotion_cache,
+	combo_pricing_values,
+	get_promotions_using_combo,
+)
+from acuamania.acuamania.promo_engine.repricing import enqueue_draft_repricing
+
 
 class ComboPromotion(Document):
-	pass
+	def on_update(self):
+		pricing_changed = self.pricing_has_changed()
+		for promo_name in get_promotions_using_combo(self.name):
+			clear_promotion_cache(promo_name)
+			if pricing_changed:
+				enqueue_draft_repricing(promo_name)
+
+	def on_trash(self):
+		for promo_name in get_promotions_using_combo(self.name):
+			clear_promotion_cache(promo_name)
+
+	def after_rename(self, old_name, new_name, merge=False):
+		for promo_name in get_promotions_using_combo(new_name):
+			clear_promotion_cache(promo_name)
+
+	def pricing_has_changed(self):
+		"""
+		True when a saved combo changed its required, free units or items.
+		New combos are not used by any promotion yet.
+		"""
+		before = self.get_doc_before_save()
+		if not before:
+			return False
+
+		return combo_pricing_values(before) != combo_pricing_values(self)
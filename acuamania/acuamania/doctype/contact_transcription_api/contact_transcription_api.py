@@ -1,6 +1,8 @@
 import frappe
 from frappe.model.document import Document
 
+from acuamania.utils.phone import find_contact_by_phone
+
 
 class ContactTranscriptionAPI(Document):
 	pass
@@ -40,10 +42,6 @@ def validate_input(phone: str, message: str):
 		frappe.throw("Both 'phone' and 'message' are required.")
 
 
-def find_contact_by_phone(phone: str) -> str | None:
-	return frappe.db.get_value("Contact Phone", {"phone": phone.strip()}, "parent")
-
-
 def sanitize_message(msg: str) -> str:
 	return str(msg).replace("\r", " ").strip()
 
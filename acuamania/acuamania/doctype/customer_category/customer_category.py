@@ -4,6 +4,19 @@
 # import frappe
 from frappe.model.document import Document
 
+from acuamania.events.lead.category_rules import clear_category_rules, compile_rule
+
 
 class CustomerCategory(Document):
-	pass
+	def validate(self):
+		if self.rule_enabled:
+			compile_rule(self.name, self.rule_field, self.rule_operator, self.rule_value)
+
+	def on_update(self):
+		clear_category_rules()
+
+	def on_trash(self):
+		clear_category_rules()
+
+	def after_rename(self, old_name, new_name, merge=False):
+		clear_category_rules()
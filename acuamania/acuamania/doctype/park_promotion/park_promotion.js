@@ -39,10 +39,22 @@ function update_fields_by_apply_type(frm) {
 		set_discount_amount_rules(frm);
 		return;
 	}
+
+	if (applyType === "combo") {
+		set_combo_rules(frm);
+		return;
+	}
 }
 
 function reset_promo_fields(frm) {
-	const fields = ["required", "free", "discount_percentage", "fixed_price", "discount_amount"];
+	const fields = [
+		"required",
+		"free",
+		"discount_percentage",
+		"fixed_price",
+		"discount_amount",
+		"combo_promotion",
+	];
 
 	fields.forEach((fieldname) => {
 		frm.toggle_display(fieldname, false);
@@ -71,3 +83,8 @@ function set_discount_amount_rules(frm) {
 	frm.toggle_display("discount_amount", true);
 	frm.set_df_property("discount_amount", "reqd", true);
 }
+
+function set_combo_rules(frm) {
+	frm.toggle_display("combo_promotion", true);
+	frm.set_df_property("combo_promotion", "reqd", true);
+}
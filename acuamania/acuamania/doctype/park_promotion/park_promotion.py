@@ -4,6 +4,35 @@
 # import frappe
 from frappe.model.document import Document
 
+from acuamania.acuamania.promo_engine.active_promotions import clear_active_promotion_index
+from acuamania.acuamania.promo_engine.promotion_cache import clear_promotion_cache, compile_promotion
+from acuamania.acuamania.promo_engine.repricing import enqueue_draft_repricing
+
 
 class ParkPromotion(Document):
-	pass
+	def on_update(self):
+		clear_promotion_cache(self.name)
+		clear_active_promotion_index()
+
+		if self.pricing_has_changed():
+			enqueue_draft_repricing(self.name)
+
+	def on_trash(self):
+		clear_promotion_cache(self.name)
+		clear_active_promotion_index()
+
+	def after_rename(self, old_name, new_name, merge=False):
+		clear_promotion_cache(old_name)
+		clear_promotion_cache(new_name)
+		clear_active_promotion_index()
+
+	def pricing_has_changed(self):
+		"""
+		True when a saved promotion changed anything that affects prices
+		(discount, price, items, categories...). New promotions have no drafts yet.
+		"""
+		before = self.get_doc_before_save()
+		if not before:
+			return False
+
+		return compile_promotion(before).pricing_values() != compile_promotion(self).pricing_values()
@@ -4,6 +4,37 @@
 # import frappe
 from frappe.model.document import Document
 
+from acuamania.acuamania.promo_engine.promotion_cache import (
+	audience_categories,
+	clear_promotion_cache,
+	get_promotions_using_audience_group,
+)
+from acuamania.acuamania.promo_engine.repricing import enqueue_draft_repricing
+
 
 class PromotionAudienceGroup(Document):
-	pass
+	def on_update(self):
+		pricing_changed = self.pricing_has_changed()
+		for promo_name in get_promotions_using_audience_group(self.name):
+			clear_promotion_cache(promo_name)
+			if pricing_changed:
+				enqueue_draft_repricing(promo_name)
+
+	def on_trash(self):
+		for promo_name in get_promotions_using_audience_group(self.name):
+			clear_promotion_cache(promo_name)
+
+	def after_rename(self, old_name, new_name, merge=False):
+		for promo_name in get_promotions_using_audience_group(new_name):
+			clear_promotion_cache(promo_name)
+
+	def pricing_has_changed(self):
+		"""
+		True when a saved group changed its customer categories.
+		New groups are not used by any promotion yet.
+		"""
+		before = self.get_doc_before_save()
+		if not before:
+			return False
+
+		return audience_categories(before) != audience_categories(self)
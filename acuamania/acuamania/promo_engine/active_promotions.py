@@ -0,0 +1,129 @@
+from bisect import bisect_right
+from datetime import timedelta
+
+import frappe
+from frappe.utils import cint, getdate
+
+from acuamania.utils.cache import clear_cached_values, get_cache_version, get_cached_value
+
+ACTIVE_PROMOTION_INDEX_NAMESPACE = "acuamania:active_promotion_index"
+
+
+class ActivePromotionIndex:
+	"""
+	Date-sorted interval index of active Park Promotions.
+
+	The validity bounds of every active promotion split the calendar into
+	segments; each segment stores the promotions valid on all of its days.
+	"Which promotions are valid on date X" is a single bisect over the
+	segment boundaries, and crossing a validity boundary needs no refresh
+	because every boundary is already in the index.
+
+	Group-discount tiers (promotions with group_min_qty) are kept as a table
+	sorted by minimum Entrada quantity, searched with one bisect.
+	"""
+
+	__slots__ = ("boundaries", "default_apply", "group_tier_thresholds", "group_tiers", "segments")
+
+	def __init__(self, boundaries, segments, default_apply, group_tiers=()):
+		self.boundaries = boundaries
+		self.segments = segments
+		self.default_apply = default_apply
+		self.group_tiers = tuple(group_tiers)
+		self.group_tier_thresholds = [min_qty for min_qty, _ in self.group_tiers]
+
+	def valid_on(self, date):
+		"""
+		Names of the active promotions valid on date.
+		"""
+		return self.segments[bisect_right(self.boundaries, getdate(date).toordinal())]
+
+	def default_apply_on(self, date):
+		"""
+		Names of the promotions valid on date that are applied automatically.
+		"""
+		return self.valid_on(date) & self.default_apply
+
+	def group_tier_on(self, date, qty):
+		"""
+		Name of the group tier for an Entrada quantity: the valid promotion with
+		the highest group_min_qty not above qty, or None.
+		"""
+		position = bisect_right(self.group_tier_thresholds, qty)
+		if not position:
+			return None
+
+		valid = self.valid_on(date)
+		for _, name in reversed(self.group_tiers[:position]):
+			if name in valid:
+				return name
+
+		return None
+
+	def group_tier_names(self):
+		return frozenset(name for _, name in self.group_tiers)
+
+	@classmethod
+	def build(cls, promotions):
+		"""
+		promotions: iterable of dicts with name, valid_from, valid_upto,
+		default_apply and group_min_qty. Missing bounds are open-ended.
+		"""
+		intervals = []
+		for promo in promotions:
+			start = getdate(promo["valid_from"]).toordinal() if promo.get("valid_from") else None
+			end = (
+				(getdate(promo["valid_upto"]) + timedelta(days=1)).toordinal()
+				if promo.get("valid_upto")
+				else None
+			)
+			intervals.append((promo["name"], start, end))
+
+		boundaries = sorted(
+			{point for _, start, end in intervals for point in (start, end) if point is not None}
+		)
+
+		segments = []
+		for index in range(len(boundaries) + 1):
+			# segment index covers [boundaries[index - 1], boundaries[index])
+			probe = boundaries[index - 1] if index else None
+			segments.append(
+				frozenset(
+					name
+					for name, start, end in intervals
+					if (start is None or (probe is not None and start <= probe))
+					and (end is None or (probe is None or probe < end))
+				)
+			)
+
+		default_apply = frozenset(promo["name"] for promo in promotions if cint(promo.get("default_apply")))
+		group_tiers = sorted(
+			(cint(promo.get("group_min_qty")), promo["name"])
+			for promo in promotions
+			if cint(promo.get("group_min_qty")) > 0
+		)
+		return cls(boundaries, segments, default_apply, group_tiers)
+
+
+def get_active_promotion_index():
+	"""
+	Cached ActivePromotionIndex (process + Redis), rebuilt after any Park Promotion change.
+	"""
+	return get_cached_value(ACTIVE_PROMOTION_INDEX_NAMESPACE, "index", _load_active_promotion_index)
+
+
+def get_active_promotion_index_version():
+	return get_cache_version(ACTIVE_PROMOTION_INDEX_NAMESPACE)
+
+
+def clear_active_promotion_index():
+	clear_cached_values(ACTIVE_PROMOTION_INDEX_NAMESPACE)
+
+
+def _load_active_promotion_index():
+	promotions = frappe.get_all(
+		"Park Promotion",
+		filters={"active": 1},
+		fields=["name", "valid_from", "valid_upto", "default_apply", "group_min_qty"],
+	)
+	return ActivePromotionIndex.build(promotions)
@@ -0,0 +1,84 @@
+import frappe
+
+MEMBERSHIP_NAMESPACE = "acuamania:customer_category_membership"
+CATEGORY_FIELD = "custom_customer_category"
+CATEGORY_CHILD_DOCTYPE = "Customer__Customer_Category"
+PARTY_DOCTYPES = ("Customer", "Contact", "Lead")
+
+
+def get_party_categories(doctype, name):
+	"""
+	Customer categories of a Customer, Contact or Lead from the membership
+	index (one child-table query the first time a party is seen).
+
+	The index is a Redis hash with one entry per party and no per-process
+	copy, so saving a party rewrites its own entry and nothing else.
+	"""
+	if doctype not in PARTY_DOCTYPES or not name:
+		return frozenset()
+
+	key = _membership_key(doctype, name)
+	categories = frappe.cache().hget(MEMBERSHIP_NAMESPACE, key)
+	if categories is None:
+		categories = _load_party_categories(doctype, name)
+		frappe.cache().hset(MEMBERSHIP_NAMESPACE, key, categories)
+
+	return categories
+
+
+def get_document_categories(doc):
+	"""
+	Customer categories a Quotation / Sales Order is priced for: its own
+	category rows plus the memberships of its customer (or lead) and contact.
+	"""
+	categories = {row.customer_category for row in doc.get(CATEGORY_FIELD) or [] if row.customer_category}
+
+	for doctype, name in get_document_parties(doc):
+		categories |= get_party_categories(doctype, name)
+
+	return frozenset(categories)
+
+
+def get_document_parties(doc):
+	parties = []
+
+	if doc.doctype == "Quotation" and doc.get("quotation_to") in PARTY_DOCTYPES:
+		parties.append((doc.quotation_to, doc.get("party_name")))
+	elif doc.get("customer"):
+		parties.append(("Customer", doc.customer))
+
+	if doc.get("contact_person"):
+		parties.append(("Contact", doc.contact_person))
+
+	return parties
+
+
+def update_party_categories(doc, method=None):
+	"""
+	on_update of Customer / Contact / Lead: writes the party's current
+	categories to the membership index; the entry is dropped again if the
+	transaction rolls back.
+	"""
+	categories = frozenset(
+		row.customer_category for row in doc.get(CATEGORY_FIELD) or [] if row.customer_category
+	)
+	frappe.cache().hset(MEMBERSHIP_NAMESPACE, _membership_key(doc.doctype, doc.name), categories)
+	frappe.db.after_rollback.add(lambda: clear_party_categories(doc.doctype, doc.name))
+
+
+def clear_party_categories(doctype, name):
+	frappe.cache().hdel(MEMBERSHIP_NAMESPACE, _membership_key(doctype, name))
+
+
+def _load_party_categories(doctype, name):
+	return frozenset(
+		frappe.get_all(
+			CATEGORY_CHILD_DOCTYPE,
+			filters={"parenttype": doctype, "parent": name, "parentfield": CATEGORY_FIELD},
+			pluck="customer_category",
+		)
+	)
+
+
+def _membership_key(doctype, name):
+	return f"{doctype}::{name}"
@@ -0,0 +1,355 @@
+import json
+import os
+import random
+import time
+
+import frappe
+from frappe.utils import today
+
+from acuamania.acuamania.promo_engine.active_promotions import clear_active_promotion_index
+from acuamania.acuamania.promo_engine.core import group_lines_by_code, price_cart
+from acuamania.acuamania.promo_engine.engine import apply_selected_promotion
+from acuamania.acuamania.promo_engine.models import Cart, Line, Promotion
+from acuamania.acuamania.promo_engine.profiling import count_queries
+from acuamania.acuamania.promo_engine.promotion_cache import clear_promotion_cache
+from acuamania.acuamania.promo_engine.rules import (
+	apply_combo,
+	apply_discount_amount,
+	apply_fixed_price,
+	apply_percentage_discount,
+	apply_required_x_free,
+)
+
+BASELINE_FILENAME = "promo_engine_benchmarks.json"
+DEFAULT_THRESHOLD = 0.30
+DEFAULT_REPEAT = 5
+RANDOM_SEED = 1511
+
+APPLY_TYPES = {
+	"requeridos x gratuitos": apply_required_x_free,
+	"precio fijo": apply_fixed_price,
+	"porcentaje": apply_percentage_discount,
+	"precio de descuento": apply_discount_amount,
+	"combo": apply_combo,
+}
+
+# (lines, units, promotions per apply_type)
+PROFILES = {
+	"smoke": [
+		(1, 1, 1),
+		(40, 400, 3),
+		(200, 2_000, 5),
+	],
+	"full": [
+		(1, 1, 1),
+		(40, 400, 3),
+		(200, 2_000, 5),
+		(1_000, 10_000, 10),
+		(5_000, 50_000, 20),
+	],
+}
+
+# Documents are only built for the smaller scenarios: apply_selected_promotion
+# also runs ERPNext's tax passes, which dominate on thousands of lines.
+MAX_DOCUMENT_LINES = 1_000
+
+SYNTHETIC_RATES = (0, 100, 250, 610, 910, 1000, 1450)
+SYNTHETIC_GROUPS = ("Entrada", "Bebidas", "Comidas", "Servicios")
+# combos are built from the first codes, present in every cart of 3+ lines
+SYNTHETIC_COMBO_CODES = 3
+
+
+def run_benchmarks(profile="smoke", update_baseline=False, threshold=None, baseline_path=None):
+	"""
+	Runs the promo engine benchmarks on synthetic carts and compares them with
+	the JSON baseline stored in the site folder.
+
+	    bench --site <site> promo-engine-benchmark --profile full
+
+	Writes the baseline when it does not exist (or update_baseline is set).
+	Throws when a timing regresses by more than threshold (fraction) or when
+	a query count grows.
+	"""
+	threshold = DEFAULT_THRESHOLD if threshold is None else float(threshold)
+	baseline_path = baseline_path or frappe.get_site_path(BASELINE_FILENAME)
+
+	results = collect_benchmarks(profile)
+	baseline = _read_baseline(baseline_path)
+
+	if update_baseline or profile not in baseline:
+		baseline[profile] = results
+		_write_baseline(baseline_path, baseline)
+		return {"profile": profile, "baseline_written": baseline_path, "results": results}
+
+	regressions = find_regressions(baseline[profile], results, threshold)
+	if regressions:
+		frappe.throw(
+			"<br>".join(regressions),
+			title=f"Promo engine benchmark regression ({profile})",
+		)
+
+	return {"profile": profile, "results": results, "regressions": []}
+
+
+def collect_benchmarks(profile="smoke", repeat=DEFAULT_REPEAT):
+	"""
+	Returns {scenario: {metric: value}} where timing metrics end in "_ms"
+	and query metrics end in "_queries".
+	"""
+	rng = random.Random(RANDOM_SEED)
+	results = {}
+
+	for lines, units, promotions_per_type in PROFILES[profile]:
+		scenario = f"{lines}l_{units}u_{promotions_per_type}p"
+		cart = make_synthetic_cart(rng, lines, units)
+		promotions = make_synthetic_promotions(rng, promotions_per_type)
+		metrics = {}
+
+		metrics["price_cart_ms"] = time_call(lambda: price_cart(cart, promotions), repeat)
+
+		items_by_code = group_lines_by_code(cart.lines)
+		for apply_type, rule in APPLY_TYPES.items():
+			promo = next(p for p in promotions if p.apply_type == apply_type)
+			metrics[f"rule[{apply_type}]_ms"] = time_call(lambda: rule(promo, items_by_code), repeat)
+
+		if lines <= MAX_DOCUMENT_LINES:
+			metrics.update(benchmark_document(cart, promotions_per_type, repeat))
+
+		results[scenario] = metrics
+
+	return results
+
+
+def benchmark_document(cart, promotions_per_type, repeat=DEFAULT_REPEAT):
+	"""
+	Times apply_selected_promotion on an unsaved Quotation and counts its queries.
+
+	The cart's items and the promotions are inserted as temporary records and
+	rolled back afterwards. Rolling back does not undo the Redis caches the
+	Park Promotion hooks wrote (compiled promotions, active-promotion index
+	and their version tokens), so those are cleared once the records are gone.
+	"""
+	promo_names = []
+	frappe.db.savepoint("promo_engine_benchmark")
+	try:
+		_insert_synthetic_items(cart)
+		promo_names = _insert_synthetic_park_promotions(promotions_per_type)
+		doc = _build_quotation(cart, promo_names)
+
+		apply_selected_promotion(doc)  # warm caches
+		with count_queries() as counter:
+			apply_selected_promotion(doc)
+
+		return {
+			"apply_selected_promotion_ms": time_call(lambda: apply_selected_promotion(doc), repeat),
+			"apply_selected_promotion_queries": counter["count"],
+		}
+	finally:
+		frappe.db.rollback(save_point="promo_engine_benchmark")
+		for promo_name in promo_names:
+			clear_promotion_cache(promo_name)
+		clear_active_promotion_index()
+
+
+def make_synthetic_cart(rng, lines, units):
+	"""
+	Spreads units over lines (each line gets at least one unit). Each item
+	code keeps one item group (see _synthetic_item_group).
+	"""
+	item_pool = max(1, lines // 3)
+	quantities = [1] * lines
+	for _ in range(max(0, units - lines)):
+		quantities[rng.randrange(lines)] += 1
+
+	cart_lines = []
+	for qty in quantities:
+		item_code = _synthetic_item_code(rng.randrange(item_pool))
+		cart_lines.append(Line(item_code, qty, rng.choice(SYNTHETIC_RATES), _synthetic_item_group(item_code)))
+
+	return Cart(cart_lines, transaction_date=today())
+
+
+def make_synthetic_promotions(rng, per_type):
+	promotions = []
+
+	for apply_type in APPLY_TYPES:
+		for index in range(per_type):
+			values = _synthetic_promotion_values(rng, apply_type)
+			scope = rng.choice(("all", "products", "categories"))
+
+			products = frozenset()
+			categories = frozenset()
+			if scope == "products":
+				products = frozenset(_synthetic_item_code(rng.randrange(50)) for _ in range(5))
+			elif scope == "categories":
+				categories = frozenset(rng.sample(SYNTHETIC_GROUPS, 2))
+
+			name = f"BENCH {apply_type} {index}"
+			promotions.append(
+				Promotion(
+					name=name,
+					promotion_name=name,
+					active=1,
+					apply_type=apply_type,
+					products=products,
+					categories=categories,
+					**values,
+				)
+			)
+
+	return promotions
+
+
+def find_regressions(baseline, results, threshold):
+	regressions = []
+
+	for scenario, metrics in results.items():
+		for metric, value in metrics.items():
+			previous = (baseline.get(scenario) or {}).get(metric)
+			if previous is None:
+				continue
+
+			if metric.endswith("_queries") and value > previous:
+				regressions.append(f"{scenario} {metric}: {previous} -> {value} queries")
+
+			if metric.endswith("_ms") and previous > 0 and value > previous * (1 + threshold):
+				regressions.append(
+					f"{scenario} {metric}: {previous:.3f} ms -> {value:.3f} ms "
+					f"(+{(value / previous - 1) * 100:.0f}%, threshold {threshold * 100:.0f}%)"
+				)
+
+	return regressions
+
+
+def time_call(func, repeat=DEFAULT_REPEAT):
+	"""
+	Best-of-N wall time of func() in milliseconds.
+	"""
+	best = None
+	for _ in range(repeat):
+		start = time.perf_counter()
+		func()
+		elapsed = (time.perf_counter() - start) * 1000
+		best = elapsed if best is None else min(best, elapsed)
+	return round(best, 4)
+
+
+def _synthetic_promotion_values(rng, apply_type):
+	if apply_type == "requeridos x gratuitos":
+		required = rng.randint(2, 5)
+		return {"required": required, "free": rng.randint(1, required - 1)}
+
+	if apply_type == "precio fijo":
+		return {"fixed_price": rng.choice((250, 610, 900))}
+
+	if apply_type == "porcentaje":
+		return {"discount_percentage": rng.choice((5, 10, 15, 25))}
+
+	if apply_type == "combo":
+		codes = rng.sample(range(SYNTHETIC_COMBO_CODES), 2)
+		return {
+			"required": 1,
+			"free": 1,
+			"bundle": tuple(sorted((_synthetic_item_code(code), 1) for code in codes)),
+		}
+
+	return {"discount_amount": rng.choice((100, 500, 1000))}
+
+
+def _synthetic_item_code(index):
+	return f"BENCH-{index:05d}"
+
+
+def _synthetic_item_group(item_code):
+	return SYNTHETIC_GROUPS[int(item_code.rsplit("-", 1)[1]) % len(SYNTHETIC_GROUPS)]
+
+
+def _insert_synthetic_items(cart):
+	for item_group in SYNTHETIC_GROUPS:
+		if not frappe.db.exists("Item Group", item_group):
+			frappe.get_doc(
+				{
+					"doctype": "Item Group",
+					"item_group_name": item_group,
+					"parent_item_group": "All Item Groups",
+				}
+			).insert(ignore_permissions=True)
+
+	for item_code in sorted({line.item_code for line in cart.lines}):
+		if not frappe.db.exists("Item", item_code):
+			frappe.get_doc(
+				{
+					"doctype": "Item",
+					"item_code": item_code,
+					"item_name": item_code,
+					"item_group": _synthetic_item_group(item_code),
+					"is_stock_item": 0,
+				}
+			).insert(ignore_permissions=True)
+
+
+def _insert_synthetic_park_promotions(per_type):
+	rng = random.Random(RANDOM_SEED)
+	names = []
+
+	for apply_type in APPLY_TYPES:
+		for index in range(per_type):
+			values = _synthetic_promotion_values(rng, apply_type)
+			bundle = values.pop("bundle", None)
+			if bundle:
+				values["combo_promotion"] = _insert_synthetic_combo(bundle, values)
+
+			promo = frappe.get_doc(
+				{
+					"doctype": "Park Promotion",
+					"promotion_name": f"BENCH {apply_type} {index} {frappe.generate_hash(length=6)}",
+					"apply_type": apply_type,
+					"active": 1,
+					"valid_from": "2000-01-01",
+					"valid_upto": "2099-12-31",
+					**values,
+				}
+			).insert(ignore_permissions=True)
+			names.append(promo.name)
+
+	return names
+
+
+def _insert_synthetic_combo(bundle, values):
+	combo = frappe.get_doc(
+		{
+			"doctype": "Combo Promotion",
+			"required": values["required"],
+			"free": values["free"],
+			"combos_promotion_items": [
+				{"product": item_code} for item_code, units in bundle for _ in range(units)
+			],
+		}
+	).insert(ignore_permissions=True)
+	return combo.name
+
+
+def _build_quotation(cart, promo_names):
+	doc = frappe.new_doc("Quotation")
+	doc.transaction_date = cart.transaction_date
+
+	for line in cart.lines:
+		doc.append("items", {"item_code": line.item_code, "qty": line.qty, "rate": line.rate})
+
+	for promo_name in promo_names:
+		doc.append("custom_promotion_table", {"promotion": promo_name})
+
+	return doc
+
+
+def _read_baseline(path):
+	if not os.path.exists(path):
+		return {}
+
+	with open(path, encoding="utf-8") as baseline_file:
+		return json.load(baseline_file)
+
+
+def _write_baseline(path, baseline):
+	with open(path, "w", encoding="utf-8") as baseline_file:
+		json.dump(baseline, baseline_file, indent=1, sort_keys=True)
@@ -0,0 +1,519 @@
+import heapq
+import time
+
+from acuamania.acuamania.promo_engine.models import Line, PricingResult, PromotionResult
+from acuamania.acuamania.promo_engine.rules import (
+	apply_combo,
+	apply_discount_amount,
+	apply_fixed_price,
+	apply_percentage_discount,
+	apply_required_x_free,
+)
+
+PRICING_MODE_STACK = "stack"
+PRICING_MODE_EXCLUSIVE = "exclusive"
+PRICING_MODES = (PRICING_MODE_STACK, PRICING_MODE_EXCLUSIVE)
+DEFAULT_TIME_BUDGET_MS = 5
+# bound on the exclusive search when no time budget is given
+MAX_EXCLUSIVE_SEARCH_NODES = 10_000
+
+
+def price_cart(
+	cart,
+	promotions,
+	mode=PRICING_MODE_STACK,
+	max_discount_percentage=0,
+	time_budget_ms=DEFAULT_TIME_BUDGET_MS,
+	promotion_timings=None,
+):
+	"""
+	Prices a cart against a list of compiled promotions (entries may be None).
+
+	Pure Python, no database access: the Frappe layer (engine.py) builds the
+	inputs and writes the result back to the document.
+
+	Modes:
+	    - "stack": every promotion is evaluated on all its matching units and
+	      the discounts are summed.
+	    - "exclusive": each unit goes to at most one promotion; promotions are
+	      assigned greedily by discount, then improved by a branch and bound
+	      search (see assign_exclusive) within time_budget_ms.
+
+	max_discount_percentage (> 0) caps the total discount to that share of
+	the cart amount, trimming the last-assigned promotions first.
+
+	When promotion_timings is a list, the pricing time (ms) of each promotion
+	is appended to it, in input order.
+
+	Promotions with an audience only discount carts whose
+	customer_categories intersect it.
+
+	Every discount is rounded to cents and allocated to the lines its
+	promotion touched (see allocate_discounts).
+
+	Returns a PricingResult whose promotions are aligned with the input list.
+	"""
+	started = time.perf_counter()
+	budget_exceeded = False
+
+	if mode == PRICING_MODE_EXCLUSIVE:
+		results, order, budget_exceeded = assign_exclusive(
+			cart, promotions, time_budget_ms, promotion_timings, started
+		)
+	else:
+		items_by_code = group_lines_by_code(cart.lines)
+		scopes = {}
+		results = [
+			_price_timed(promo, items_by_code, promotion_timings, scopes, cart.customer_categories)
+			for promo in promotions
+		]
+		order = list(range(len(results)))
+
+	if max_discount_percentage and max_discount_percentage > 0:
+		cap_discounts(results, order, get_cart_amount(cart) * max_discount_percentage / 100.0)
+
+	line_discounts = allocate_discounts(cart, results)
+	total_discount = round(sum(result.discount or 0 for result in results), 2)
+
+	return PricingResult(
+		results,
+		total_discount,
+		mode=mode,
+		budget_exceeded=budget_exceeded,
+		line_discounts=line_discounts,
+	)
+
+
+def assign_exclusive(
+	cart, promotions, time_budget_ms=DEFAULT_TIME_BUDGET_MS, promotion_timings=None, started=None
+):
+	"""
+	Gives each unit to at most one promotion, looking for the assignment with
+	the highest customer discount:
+
+	    1. Lazy greedy. Every promotion is priced on the full cart; that
+	       discount is an upper bound of what it can still give once units are
+	       taken. The promotion with the highest bound is re-priced on the
+	       units that are still free. If it still beats the next bound it is
+	       accepted and its units are consumed; otherwise it goes back with its
+	       new bound.
+	    2. Branch and bound (see _search_exclusive) from the greedy result,
+	       which is only a heuristic: a promotion that takes many units can
+	       block two smaller ones worth more together.
+
+	time_budget_ms counts from started (default: now), so it covers the
+	initial pricing too: once it is spent, the promotions not priced yet are
+	skipped (at least one is always priced), the greedy stops after
+	accepting the best one and the search keeps the best assignment found so
+	far, so the result is optimal only when the search completes. Promotions
+	not accepted get no discount.
+
+	Returns (results, acceptance order, budget_exceeded); budget_exceeded
+	means the initial pricing or the greedy was cut short.
+	"""
+	started = time.perf_counter() if started is None else started
+	deadline = started + time_budget_ms / 1000.0 if time_budget_ms else None
+	remaining = [line.qty or 0 for line in cart.lines]
+	items_by_code = group_lines_by_code(cart.lines)
+	scopes = {}
+
+	results = []
+	bounds = []
+	budget_exceeded = False
+	for index, promo in enumerate(promotions):
+		if bounds and deadline and time.perf_counter() > deadline:
+			budget_exceeded = True
+			results.append(_unpriced_result(promo))
+			if promotion_timings is not None:
+				promotion_timings.append(0.0)
+			continue
+
+		result = _price_timed(promo, items_by_code, promotion_timings, scopes, cart.customer_categories)
+		results.append(result)
+		if result.discount and result.discount > 0:
+			heapq.heappush(bounds, (-result.discount, index))
+
+	accepted = {}
+	order = []
+
+	while bounds:
+		if order and deadline and time.perf_counter() > deadline:
+			budget_exceeded = True
+			break
+
+		_, index = heapq.heappop(bounds)
+		free_lines = _free_lines(cart.lines, remaining)
+		# scopes (and so min_qty_required) stay those of the full cart
+		result = price_promotion(
+			promotions[index],
+			group_lines_by_code(line for _, line in free_lines),
+			scopes,
+			cart.customer_categories,
+		)
+
+		if not result.discount or result.discount <= 0:
+			continue
+
+		if bounds and result.discount < -bounds[0][0]:
+			heapq.heappush(bounds, (-result.discount, index))
+			continue
+
+		accepted[index] = result
+		order.append(index)
+		for line, units in result.units.items():
+			remaining[line.index] -= units
+
+	if not budget_exceeded and sum(1 for result in results if result.discount and result.discount > 0) > 1:
+		best = _search_exclusive(
+			cart, promotions, [(index, accepted[index]) for index in order], scopes, deadline
+		)
+		accepted = dict(best)
+		order = [index for index, _ in best]
+
+	for index, result in enumerate(results):
+		if index in accepted:
+			results[index] = accepted[index]
+		elif result.applied_name:
+			results[index] = PromotionResult(result.promotion, result.applied_name, 0, 0)
+
+	return results, order, budget_exceeded
+
+
+def _unpriced_result(promo):
+	if not promo or not promo.active:
+		return PromotionResult(promo)
+	return PromotionResult(promo, promo.promotion_name or promo.name, 0, 0)
+
+
+def _search_exclusive(cart, promotions, greedy, scopes, deadline):
+	"""
+	Depth-first branch and bound over the promotions accepted, in order,
+	starting with greedy ([(index, result)]) as the best assignment.
+
+	At each node the promotions not yet accepted are priced on the free
+	units; the sum of their discount bounds (see _discount_bound) caps what
+	the branch can still add. Branches that cannot beat the best assignment
+	are pruned, and states already reached (free units, accepted set) with
+	at least the same discount are skipped.
+
+	Stops at deadline or after MAX_EXCLUSIVE_SEARCH_NODES nodes and returns
+	the best [(index, result)] found.
+	"""
+	best = [sum(result.discount for _, result in greedy), greedy]
+	seen = {}
+	nodes = 0
+
+	def visit(remaining, discount, accepted):
+		nonlocal nodes
+		nodes += 1
+		if nodes > MAX_EXCLUSIVE_SEARCH_NODES or (deadline and time.perf_counter() > deadline):
+			return False
+
+		taken = frozenset(index for index, _ in accepted)
+		state = (tuple(remaining), taken)
+		if seen.get(state, -1) >= discount - 1e-9:
+			return True
+		seen[state] = discount
+
+		if discount > best[0] + 1e-9:
+			best[:] = [discount, accepted]
+
+		items_by_code = group_lines_by_code(line for _, line in _free_lines(cart.lines, remaining))
+		candidates = []
+		for index, promo in enumerate(promotions):
+			if index in taken:
+				continue
+			result = price_promotion(promo, items_by_code, scopes, cart.customer_categories)
+			if result.discount and result.discount > 0:
+				candidates.append((index, result))
+
+		bound = sum(_discount_bound(promotions[index], result, items_by_code) for index, result in candidates)
+		if discount + bound <= best[0] + 1e-9:
+			return True
+
+		candidates.sort(key=lambda candidate: -candidate[1].discount)
+		for index, result in candidates:
+			next_remaining = list(remaining)
+			for line, units in result.units.items():
+				next_remaining[line.index] -= units
+
+			if not visit(next_remaining, discount + result.discount, [*accepted, (index, result)]):
+				return False
+
+		return True
+
+	visit([line.qty or 0 for line in cart.lines], 0, [])
+	return best[1]
+
+
+def _discount_bound(promo, result, items_by_code):
+	"""
+	Most a promotion priced as result on items_by_code can give on any part
+	of those units.
+
+	Taking units never raises a percentage, fixed price or flat discount.
+	"requeridos x gratuitos" and combos give away their cheapest units
+	instead, so dropping cheap units can raise their discount: they are
+	bounded by their result.qty most expensive units in scope (fewer units
+	never grant more free ones).
+	"""
+	if promo.apply_type not in ("requeridos x gratuitos", "combo"):
+		return result.discount
+
+	rates = sorted(
+		(
+			(line.rate, line.qty)
+			for code in resolve_applicable_item_codes(promo, items_by_code)
+			for line in items_by_code[code]
+			if line.qty and line.rate and line.rate > 0
+		),
+		reverse=True,
+	)
+
+	bound = 0
+	free_units = result.qty or 0
+	for rate, qty in rates:
+		if free_units <= 0:
+			break
+		taken = min(qty, free_units)
+		bound += rate * taken
+		free_units -= taken
+
+	return bound
+
+
+def cap_discounts(results, order, max_discount):
+	"""
+	Trims discounts so their sum does not exceed max_discount, starting from
+	the last promotion in order.
+	"""
+	excess = sum(result.discount or 0 for result in results) - max(max_discount, 0)
+
+	for index in reversed(order):
+		if excess <= 0:
+			break
+
+		result = results[index]
+		trimmed = min(result.discount or 0, excess)
+		result.discount = (result.discount or 0) - trimmed
+		excess -= trimmed
+
+
+def allocate_discounts(cart, results):
+	"""
+	Splits each promotion discount over the lines it touched and returns
+	the discount of every cart line.
+
+	A line's weight is its touched units times its rate (the rate above the
+	fixed price for "precio fijo"). Discounts are rounded to cents first
+	and split with split_cents, so the line discounts of a promotion add up
+	exactly to its discount; when every weight is 0 (a flat amount on
+	zero-rate lines) the first touched line carries it all.
+	"""
+	line_cents = [0] * len(cart.lines)
+
+	for result in results:
+		cents = int(round((result.discount or 0) * 100))
+		result.allocation = {}
+
+		if cents <= 0:
+			if result.discount:
+				result.discount = 0
+			continue
+
+		result.discount = cents / 100.0
+		weights = _line_weights(result.promotion, result.units)
+		if not weights:
+			weights = {index: (line.qty or 0) * (line.rate or 0) for index, line in enumerate(cart.lines)}
+
+		shares = split_cents(cents, weights)
+		if not shares and cart.lines:
+			shares = {min((line.index for line in result.units or ()), default=0): cents}
+
+		for index, share in shares.items():
+			result.allocation[index] = share / 100.0
+			line_cents[index] += share
+
+	return [cents / 100.0 for cents in line_cents]
+
+
+def split_cents(cents, weights):
+	"""
+	{key: cents} proportional to the positive weights, adding up to cents.
+
+	Rounds the running total instead of each share (one pass, no sort): every
+	share is within a cent of its exact value and no cent is lost.
+	"""
+	total = sum(weight for weight in weights.values() if weight > 0)
+	if not total:
+		return {}
+
+	shares = {}
+	running = 0.0
+	given = 0
+	key = None
+	for key, weight in weights.items():
+		if weight > 0:
+			running += cents * weight / total
+			share = int(round(running)) - given
+			given += share
+			if share:
+				shares[key] = share
+
+	if given != cents:
+		shares[key] = shares.get(key, 0) + cents - given
+
+	return shares
+
+
+def _line_weights(promo, units):
+	if not promo or not units:
+		return {}
+
+	offset = promo.fixed_price or 0 if promo.apply_type == "precio fijo" else 0
+	return {line.index: taken * ((line.rate or 0) - offset) for line, taken in units.items()}
+
+
+def get_cart_amount(cart):
+	return sum((line.qty or 0) * (line.rate or 0) for line in cart.lines)
+
+
+def price_promotion(promo, items_by_code, scopes=None, customer_categories=None):
+	"""
+	Prices one promotion:
+	    - Checks the promotion's audience against customer_categories
+	    - Resolves applicable items (product OR category)
+	    - Checks min_qty_required against the units in that scope
+	    - Calculates discount and qty, and the {line index: units} the rule
+	      touched (result.units, {Line: units}) when it gives a discount
+
+	scopes memoizes (applicable codes, eligible qty) per product/category
+	scope, so promotions sharing a scope on the same cart resolve it once.
+	"""
+	if not promo or not promo.active:
+		return PromotionResult(promo)
+
+	applied_name = promo.promotion_name or promo.name
+
+	if not reaches_audience(promo, customer_categories):
+		return PromotionResult(promo, applied_name, 0, 0)
+
+	applicable_codes, eligible_qty = resolve_scope(promo, items_by_code, scopes)
+	if not applicable_codes:
+		return PromotionResult(promo, applied_name)
+
+	if promo.min_qty_required and eligible_qty < promo.min_qty_required:
+		return PromotionResult(promo, applied_name, 0, 0)
+
+	scoped_items = {code: lines for code, lines in items_by_code.items() if code in applicable_codes}
+
+	touched = {}
+	discount, qty = dispatch_promotion_logic(promo, scoped_items, touched) or (0, 0)
+
+	result = PromotionResult(promo, applied_name, discount, qty)
+	if discount and discount > 0:
+		result.units = touched
+	return result
+
+
+def reaches_audience(promo, customer_categories):
+	"""
+	True when the promotion has no audience or the buyer belongs to one of
+	its customer categories.
+	"""
+	if not promo.audience:
+		return True
+
+	return not promo.audience.isdisjoint(customer_categories or ())
+
+
+def resolve_scope(promo, items_by_code, scopes=None):
+	"""
+	(applicable item codes, units in scope) of a promotion on items_by_code.
+	"""
+	key = (promo.products or frozenset(), promo.categories or frozenset())
+	if scopes is not None and key in scopes:
+		return scopes[key]
+
+	applicable_codes = resolve_applicable_item_codes(promo, items_by_code)
+	eligible_qty = sum(
+		line.qty for code in applicable_codes for line in items_by_code[code] if line.qty and line.qty > 0
+	)
+
+	if scopes is not None:
+		scopes[key] = (applicable_codes, eligible_qty)
+
+	return applicable_codes, eligible_qty
+
+
+def group_lines_by_code(lines):
+	grouped = {}
+	for line in lines:
+		if line.item_code:
+			grouped.setdefault(line.item_code, []).append(line)
+	return grouped
+
+
+def dispatch_promotion_logic(promo, items_by_code, touched=None):
+	promo_type = promo.apply_type
+
+	if promo_type == "requeridos x gratuitos":
+		return apply_required_x_free(promo, items_by_code, touched)
+
+	if promo_type == "precio fijo":
+		return apply_fixed_price(promo, items_by_code, touched)
+
+	if promo_type == "porcentaje":
+		return apply_percentage_discount(promo, items_by_code, touched)
+
+	if promo_type == "precio de descuento":
+		return apply_discount_amount(promo, items_by_code, touched)
+
+	if promo_type == "combo":
+		return apply_combo(promo, items_by_code, touched)
+
+	return 0, 0
+
+
+def resolve_applicable_item_codes(promo, items_by_code):
+	"""
+	Determines which item_codes are eligible for a promotion.
+
+	OR logic:
+	- Explicit products in park_promotion_items
+	- Line item_group matches promo.applicable_categories
+	"""
+	explicit_products = promo.products or frozenset()
+	promo_categories = promo.categories or frozenset()
+
+	if not explicit_products and not promo_categories:
+		return set(items_by_code.keys())
+
+	eligible_codes = set()
+
+	for item_code, lines in items_by_code.items():
+		if item_code in explicit_products or lines[0].item_group in promo_categories:
+			eligible_codes.add(item_code)
+
+	return eligible_codes
+
+
+def _price_timed(promo, items_by_code, timings, scopes=None, customer_categories=None):
+	if timings is None:
+		return price_promotion(promo, items_by_code, scopes, customer_categories)
+
+	start = time.perf_counter()
+	result = price_promotion(promo, items_by_code, scopes, customer_categories)
+	timings.append((time.perf_counter() - start) * 1000)
+	return result
+
+
+def _free_lines(lines, remaining):
+	"""
+	[(line index, Line with the still unassigned qty)] for lines with free units.
+	"""
+	return [
+		(index, Line(line.item_code, remaining[index], line.rate, line.item_group, index))
+		for index, line in enumerate(lines)
+		if remaining[index] > 0
+	]
@@ -1,17 +1,34 @@
 import frappe
-from frappe.utils import today
-
-from acuamania.acuamania.promo_engine.rules import (
-	apply_discount_amount,
-	apply_fixed_price,
-	apply_percentage_discount,
-	apply_required_x_free,
+from frappe.utils import flt, today
+
+from acuamania.acuamania.promo_engine.active_promotions import get_active_promotion_index
+from acuamania.acuamania.promo_engine.audiences import get_document_categories
+from acuamania.acuamania.promo_engine.core import price_cart
+from acuamania.acuamania.promo_engine.fingerprint import (
+	FINGERPRINT_FIELD,
+	compute_pricing_fingerprint,
+	is_pricing_current,
+	set_pricing_fingerprint,
+)
+from acuamania.acuamania.promo_engine.item_groups import (
+	get_item_group_interval,
+	get_item_group_map,
+	is_item_group_within,
 )
+from acuamania.acuamania.promo_engine.models import Cart, Line
+from acuamania.acuamania.promo_engine.policy import get_pricing_policy
+from acuamania.acuamania.promo_engine.profiling import (
+	get_profiler,
+	phase,
+	profile_document,
+	promotion_phase,
+)
+from acuamania.acuamania.promo_engine.promotion_cache import get_compiled_promotion
+from acuamania.acuamania.promo_engine.redemptions import is_promotion_exhausted
 
-GROUP_PROMO_LABEL = "Descuento de Grupo"
 ENTRADA_ITEM_GROUP = "Entrada"
-GROUP_PROMO_MIN_QTY_EXCLUSIVE = 15
-ITEM_CATEGORY_FIELD = "item_group"
+LINE_DISCOUNT_FIELD = "custom_promotion_discount"
+PROMOTION_ROW_FIELDS = ("promotion", "applied_name", "discount", "qty")
 
 
 def apply_selected_promotion(doc, method=None):
@@ -21,36 +38,142 @@ def apply_selected_promotion(doc, method=None):
 	Supports ANY number of promotions via child table:
 	    doc.custom_promotion_table
 
-	Auto-injects 'Descuento de Grupo' when total qty of items in 'Entrada'
-	item group (including its descendants) is > 15, only if promo is active.
+	Auto-injects the group-discount tier matching the total qty of items in
+	the 'Entrada' item group (including its descendants): the active
+	promotion with the highest 'group_min_qty' not above that qty. Injected
+	tiers that no longer match are removed.
+
+	Auto-applies active promotions flagged 'default_apply' and drops
+	promotions that are not valid on the document date, both answered by
+	the cached active-promotion index (no query against Park Promotion).
 
 	Promotion applicability uses OR logic:
 	    - Explicit products (park_promotion_items)
 	    - Item category in promo.applicable_categories (Table MultiSelect)
+
+	This is the Frappe layer: it builds the Cart and compiled promotions,
+	prices them with the framework-free core (core.price_cart) and writes
+	the result back to the document.
+
+	Re-pricing (including the two tax passes) is skipped when the pricing
+	fingerprint stored on the document still matches its lines, promotion
+	rows, date and promotion versions.
+
+	With site config acuamania_promo_profiling set, every call records the
+	time and SQL count of each phase and promotion row (see profiling.py).
+	"""
+	with profile_document(doc):
+		with phase("fingerprint"):
+			is_current = is_pricing_current(doc, compute_pricing_fingerprint(doc))
+
+		if is_current:
+			return
+
+		reprice_document(doc)
+
+		with phase("set_fingerprint"):
+			set_pricing_fingerprint(doc)
+
+
+def carry_pricing(source_doc, target_doc):
+	"""
+	Copies the promotion rows, customer categories and pricing fingerprint of
+	a Quotation to the Sales Order mapped from it (the mapper only copies
+	items and taxes), so the Sales Order before_save reuses the Quotation's
+	result while its fingerprint still matches and re-prices otherwise.
+	"""
+	target_doc.set("custom_promotion_table", [])
+	for row in get_promotion_rows(source_doc):
+		target_doc.append(
+			"custom_promotion_table",
+			{fieldname: row.get(fieldname) for fieldname in PROMOTION_ROW_FIELDS},
+		)
+
+	if not target_doc.get("custom_customer_category"):
+		for row in source_doc.get("custom_customer_category") or []:
+			target_doc.append("custom_customer_category", {"customer_category": row.customer_category})
+
+	target_doc.set(FINGERPRINT_FIELD, source_doc.get(FINGERPRINT_FIELD))
+
+
+def reprice_document(doc):
+	"""
+	Resets the document discount and prices it from scratch.
 	"""
 	reset_discount_fields(doc)
-	ensure_totals_are_initialized(doc)
+
+	with phase("initial_taxes"):
+		ensure_totals_are_initialized(doc)
 
 	items_by_code = group_items_by_code(doc)
 	if not items_by_code:
 		return
 
-	ensure_group_promotion_if_applicable(doc)
+	with phase("item_groups"):
+		item_groups = get_item_group_map(items_by_code.keys())
+
+	with phase("active_index"):
+		valid_promotions = get_active_promotion_index().valid_on(get_document_date(doc))
+
+	with phase("automatic_promotions"):
+		ensure_group_promotion_if_applicable(doc, item_groups)
+		ensure_default_promotions(doc)
 
 	promotion_rows = get_promotion_rows(doc)
 	if not promotion_rows:
 		return
 
-	total_discount = 0
+	cart = build_cart(doc, item_groups)
+
+	with phase("load_promotions"):
+		promotions = [load_row_promotion(row, valid_promotions) for row in promotion_rows]
+
+	profiler = get_profiler()
+	promotion_timings = [] if profiler else None
+
+	with phase("price_cart"):
+		result = price_cart(cart, promotions, promotion_timings=promotion_timings, **get_pricing_policy())
+
+	if profiler:
+		for row, price_ms, promotion_result in zip(
+			promotion_rows, promotion_timings, result.promotions, strict=True
+		):
+			profiler.add_promotion_metrics(
+				row.promotion, price_ms=round(price_ms, 3), discount=promotion_result.discount
+			)
 
-	for row in promotion_rows:
-		process_single_promotion_row(row, items_by_code)
-		total_discount += row.discount or 0
+	write_promotion_results(promotion_rows, result)
+	write_line_discounts(doc, result)
 
-	if total_discount <= 0:
+	if result.total_discount <= 0:
 		return
 
-	apply_document_discount(doc, total_discount)
+	with phase("discount_taxes"):
+		apply_document_discount(doc, result.total_discount)
+
+
+def load_row_promotion(row, valid_promotions):
+	"""
+	Compiled promotion of a promotion row, or None when it is not valid on
+	the document date or its redemption cap is used up.
+	"""
+	if row.promotion not in valid_promotions:
+		return None
+
+	with promotion_phase(row.promotion, "load"):
+		promo = load_promo(row.promotion)
+
+	if is_promotion_exhausted(promo):
+		# background jobs (e.g. repricing) have nobody to show the alert to
+		if getattr(frappe.local, "request", None):
+			frappe.msgprint(
+				f"La promoción {promo.promotion_name or promo.name} alcanzó su límite de canjes y no se aplicó.",
+				alert=True,
+				indicator="orange",
+			)
+		return None
+
+	return promo
 
 
 def ensure_totals_are_initialized(doc):
@@ -63,17 +186,20 @@ def ensure_totals_are_initialized(doc):
 		pass
 
 
-def ensure_group_promotion_if_applicable(doc):
+def ensure_group_promotion_if_applicable(doc, item_groups):
 	"""
-	Adds 'Descuento de Grupo' to custom_promotion_table when Entrada qty > 15,
-	only if the promotion exists and is active. Idempotent.
+	Adds the matching group-discount tier to custom_promotion_table when
+	missing, flagged auto_applied. Only auto_applied rows of other tiers are
+	dropped (the cart moved to another tier); tiers selected by hand stay.
+	Idempotent.
 	"""
-	entrada_qty = get_total_qty_for_item_group(doc, ENTRADA_ITEM_GROUP)
+	promo_name = get_group_promotion_if_applicable(doc, item_groups)
+	tier_names = get_active_promotion_index().group_tier_names()
 
-	if entrada_qty <= GROUP_PROMO_MIN_QTY_EXCLUSIVE:
-		return
+	for row in list(doc.get("custom_promotion_table") or []):
+		if row.auto_applied and row.promotion in tier_names and row.promotion != promo_name:
+			doc.remove(row)
 
-	promo_name = get_active_promotion_name_by_label(GROUP_PROMO_LABEL)
 	if not promo_name:
 		return
 
@@ -81,85 +207,65 @@ def ensure_group_promotion_if_applicable(doc):
 	if promotion_already_present(promotion_rows, promo_name):
 		return
 
-	doc.append("custom_promotion_table", {"promotion": promo_name})
+	doc.append("custom_promotion_table", {"promotion": promo_name, "auto_applied": 1})
 
 
-def get_total_qty_for_item_group(doc, item_group_name):
+def ensure_default_promotions(doc):
 	"""
-	Sums qty for items where Item.item_group is the given item_group_name
-	or a descendant of it.
+	Appends every promotion flagged 'default_apply' that is valid on the
+	document date and not already selected. Idempotent.
 	"""
-	root_group = (
-		frappe.db.get_value(
-			"Item Group",
-			{"item_group_name": item_group_name},
-			"name",
-		)
-		or item_group_name
-	)
+	promotion_rows = doc.get("custom_promotion_table") or []
+	for promo_name in get_default_promotions(doc):
+		if not promotion_already_present(promotion_rows, promo_name):
+			doc.append("custom_promotion_table", {"promotion": promo_name})
 
-	group_names = get_item_group_tree_names(root_group)
-	if not group_names:
-		group_names = [root_group]
 
-	item_codes = get_item_codes_by_item_groups(group_names)
-	if not item_codes:
-		return 0
+def get_group_promotion_if_applicable(doc, item_groups):
+	"""
+	Name of the group-discount tier for the document's Entrada qty, or None.
 
-	total = 0
-	for row in getattr(doc, "items", []) or []:
-		if row.item_code in item_codes:
-			total += float(row.qty or 0)
+	The tier table is part of the cached active-promotion index, so no query
+	runs; documents whose total qty is below the lowest tier stop before the
+	Entrada qty is computed.
+	"""
+	index = get_active_promotion_index()
+	if not index.group_tiers:
+		return None
 
-	return total
+	total_qty = sum(float(row.qty or 0) for row in getattr(doc, "items", []) or [])
+	if total_qty < index.group_tier_thresholds[0]:
+		return None
 
+	entrada_qty = get_total_qty_for_item_group(doc, ENTRADA_ITEM_GROUP, item_groups)
+	return index.group_tier_on(get_document_date(doc), entrada_qty)
 
-def get_item_group_tree_names(root_group_name):
+
+def get_default_promotions(doc):
 	"""
-	Returns root + descendants using nested set (lft/rgt).
+	Sorted names of the 'default_apply' promotions valid on the document date.
 	"""
-	bounds = frappe.db.get_value("Item Group", root_group_name, ["lft", "rgt"], as_dict=True)
-	if not bounds:
-		return []
-
-	return frappe.get_all(
-		"Item Group",
-		filters={
-			"lft": [">=", bounds.lft],
-			"rgt": ["<=", bounds.rgt],
-		},
-		pluck="name",
-		order_by="lft asc",
-	)
+	return sorted(get_active_promotion_index().default_apply_on(get_document_date(doc)))
 
 
-def get_item_codes_by_item_groups(item_group_names):
+def get_total_qty_for_item_group(doc, item_group_name, item_groups):
 	"""
-	Returns item codes for items that belong to any of the given item groups.
+	Sums qty for items where Item.item_group is the given item_group_name
+	or a descendant of it.
+
+	Only the document's own item codes are checked: each item's group is
+	tested against the cached nested-set (lft/rgt) interval of the root group.
 	"""
-	if not item_group_names:
-		return set()
-
-	return set(
-		frappe.get_all(
-			"Item",
-			filters={"item_group": ["in", item_group_names]},
-			pluck="name",
-		)
-		or []
-	)
+	interval = get_item_group_interval(item_group_name)
+	if not interval:
+		return 0
 
+	total = 0
+	for row in getattr(doc, "items", []) or []:
+		if is_item_group_within(item_groups.get(row.item_code), interval):
+			total += float(row.qty or 0)
 
-def get_active_promotion_name_by_label(promotion_label):
-	"""
-	Finds an active Park Promotion by promotion_name (human label).
-	Returns its docname or None.
-	"""
-	return frappe.db.get_value(
-		"Park Promotion",
-		{"promotion_name": promotion_label, "active": 1},
-		"name",
-	)
+	return total
 
 
 def promotion_already_present(rows, promo_name):
@@ -174,49 +280,54 @@ def get_promotion_rows(doc):
 	return doc.get("custom_promotion_table") or []
 
 
-def process_single_promotion_row(row, items_by_code):
+def build_cart(doc, item_groups):
 	"""
-	Processes one promotion row:
-	    - Loads Park Promotion
-	    - Resolves applicable items (product OR category)
-	    - Calculates discount
-	    - Saves applied name + discount into the row
+	Builds the framework-free Cart from the document items and the customer
+	categories of its party.
 	"""
-	promo = load_promo(row.promotion)
-	if not promo or not getattr(promo, "active", 0):
-		row.applied_name = ""
-		row.discount = 0
-		return
-
-	applicable_codes = resolve_applicable_item_codes(promo, items_by_code)
-	if not applicable_codes:
-		row.applied_name = promo.promotion_name or promo.name
-		row.discount = 0
-		return
+	lines = [
+		Line(row.item_code, flt(row.qty), flt(row.rate), item_groups.get(row.item_code))
+		for row in getattr(doc, "items", []) or []
+		if row.item_code
+	]
+
+	return Cart(
+		lines,
+		transaction_date=get_document_date(doc),
+		customer_categories=get_document_categories(doc),
+	)
 
-	scoped_items = {code: rows for code, rows in items_by_code.items() if code in applicable_codes}
 
-	discount, qty = calculate_discount_and_qty(promo, scoped_items)
+def get_document_date(doc):
+	return getattr(doc, "transaction_date", None) or getattr(doc, "posting_date", None) or today()
 
-	row.applied_name = promo.promotion_name or promo.name
-	row.discount = discount
-	row.qty = qty
 
+def write_promotion_results(promotion_rows, result):
+	"""
+	Saves applied name + discount (and qty when evaluated) into each row.
+	"""
+	for row, promotion_result in zip(promotion_rows, result.promotions, strict=True):
+		row.applied_name = promotion_result.applied_name
+		row.discount = promotion_result.discount
+		if promotion_result.qty is not None:
+			row.qty = promotion_result.qty
 
-def load_promo(promo_name):
-	if not promo_name:
-		return None
-	try:
-		return frappe.get_doc("Park Promotion", promo_name)
-	except frappe.DoesNotExistError:
-		return None
 
+def write_line_discounts(doc, result):
+	"""
+	Stores the promotion discount allocated to each item row (same rows,
+	same order as build_cart).
+	"""
+	rows = [row for row in doc.get("items") or [] if row.item_code]
+	for row, line_discount in zip(rows, result.line_discounts, strict=True):
+		row.set(LINE_DISCOUNT_FIELD, line_discount)
 
-def calculate_discount_and_qty(promo, items_by_code):
-	if not promo:
-		return 0, 0
 
-	return dispatch_promotion_logic(promo, items_by_code) or (0, 0)
+def load_promo(promo_name):
+	"""
+	Returns the compiled (read-only, cached) Park Promotion or None.
+	"""
+	return get_compiled_promotion(promo_name)
 
 
 def reset_discount_fields(doc):
@@ -224,6 +335,9 @@ def reset_discount_fields(doc):
 	doc.additional_discount_percentage = 0
 	doc.discount_amount = 0
 
+	for row in doc.get("items") or []:
+		row.set(LINE_DISCOUNT_FIELD, 0)
+
 
 def group_items_by_code(doc):
 	grouped = {}
@@ -233,36 +347,16 @@ def group_items_by_code(doc):
 	return grouped
 
 
-def dispatch_promotion_logic(promo, items_by_code):
-	promo_type = promo.apply_type
-
-	if promo_type == "requeridos x gratuitos":
-		return apply_required_x_free(promo, items_by_code)
-
-	if promo_type == "precio fijo":
-		return apply_fixed_price(promo, items_by_code)
-
-	if promo_type == "porcentaje":
-		return apply_percentage_discount(promo, items_by_code)
-
-	if promo_type == "precio de descuento":
-		return apply_discount_amount(promo, items_by_code)
-
-	return 0, 0
-
-
 def get_applicable_promotions(doc):
-	doc_date = getattr(doc, "transaction_date", None) or getattr(doc, "posting_date", None) or today()
-
-	return frappe.get_all(
-		"Park Promotion",
-		filters={
-			"active": 1,
-			"valid_from": ["<=", doc_date],
-			"valid_upto": [">=", doc_date],
-		},
-		fields=["name", "promotion_name", "apply_type"],
-		order_by="valid_from asc, promotion_name asc",
+	"""
+	Compiled promotions valid on the document date, from the active-promotion index.
+	"""
+	valid_promotions = get_active_promotion_index().valid_on(get_document_date(doc))
+	promotions = [load_promo(promo_name) for promo_name in valid_promotions]
+
+	return sorted(
+		(promo for promo in promotions if promo),
+		key=lambda promo: (str(promo.valid_from or ""), promo.promotion_name or ""),
 	)
 
 
@@ -276,56 +370,3 @@ def apply_document_discount(doc, discount_amount):
 		doc.run_method("calculate_taxes_and_totals")
 	except Exception:
 		pass
-
-
-def get_promo_applicable_categories(promo):
-	"""
-	Extracts category values from a Table MultiSelect field
-	on Park Promotion.
-	"""
-	categories = set()
-
-	for row in getattr(promo, "applicable_categories", []) or []:
-		category = getattr(row, "category", None)
-		if category:
-			categories.add(category)
-
-	return categories
-
-
-def resolve_applicable_item_codes(promo, items_by_code):
-	"""
-	Determines which item_codes are eligible for a promotion.
-
-	OR logic:
-	- Explicit products in park_promotion_items
-	- Item category matches promo.applicable_categories
-	"""
-	explicit_products = {
-		row.product
-		for row in getattr(promo, "park_promotion_items", []) or []
-		if getattr(row, "product", None)
-	}
-
-	promo_categories = get_promo_applicable_categories(promo)
-
-	if not explicit_products and not promo_categories:
-		return set(items_by_code.keys())
-
-	eligible_codes = set()
-
-	for item_code in items_by_code.keys():
-		if item_code in explicit_products:
-			eligible_codes.add(item_code)
-			continue
-
-		item_category = frappe.db.get_value(
-			"Item",
-			item_code,
-			ITEM_CATEGORY_FIELD,
-		)
-
-		if item_category and item_category in promo_categories:
-			eligible_codes.add(item_code)
-
-	return eligible_codes
@@ -0,0 +1,68 @@
+import hashlib
+import json
+
+from frappe.utils import flt
+
+from acuamania.acuamania.promo_engine.active_promotions import get_active_promotion_index_version
+from acuamania.acuamania.promo_engine.audiences import get_document_categories
+from acuamania.acuamania.promo_engine.policy import get_pricing_policy
+from acuamania.acuamania.promo_engine.promotion_cache import get_compiled_promotion
+from acuamania.acuamania.promo_engine.redemptions import is_promotion_exhausted
+
+FINGERPRINT_FIELD = "custom_promo_fingerprint"
+
+# Bump when the pricing logic changes so stored fingerprints stop matching.
+FINGERPRINT_VERSION = 5
+
+
+def compute_pricing_fingerprint(doc):
+	"""
+	Hash of everything the promo engine prices from:
+	    - item lines (item_code, qty, rate)
+	    - promotion rows, the version (modified) of each promotion and whether
+	      its redemption cap is used up
+	    - transaction date
+	    - customer categories of the party (audience promotions)
+	    - version of the active-promotion index (validity / default promotions)
+	    - pricing policy (mode and discount cap)
+	"""
+	promotion_rows = doc.get("custom_promotion_table") or []
+
+	payload = {
+		"v": FINGERPRINT_VERSION,
+		"date": str(doc.get("transaction_date") or doc.get("posting_date") or ""),
+		"lines": [
+			[row.item_code, flt(row.qty), flt(row.rate)] for row in doc.get("items") or [] if row.item_code
+		],
+		"promotions": [[row.promotion, _promotion_version(row.promotion)] for row in promotion_rows],
+		"categories": sorted(get_document_categories(doc)),
+		"active_index": get_active_promotion_index_version(),
+		"policy": get_pricing_policy(),
+	}
+
+	serialized = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+	return hashlib.sha1(serialized.encode("utf-8")).hexdigest()
+
+
+def is_pricing_current(doc, fingerprint):
+	"""
+	True when the stored fingerprint matches and the document discount is
+	still the one the engine wrote (nobody edited it by hand).
+	"""
+	if not fingerprint or doc.get(FINGERPRINT_FIELD) != fingerprint:
+		return False
+
+	if doc.get("apply_discount_on") != "Grand Total" or flt(doc.get("additional_discount_percentage")):
+		return False
+
+	promotion_discount = sum(flt(row.discount) for row in doc.get("custom_promotion_table") or [])
+	return flt(doc.get("discount_amount"), 2) == flt(promotion_discount, 2)
+
+
+def set_pricing_fingerprint(doc):
+	doc.set(FINGERPRINT_FIELD, compute_pricing_fingerprint(doc))
+
+
+def _promotion_version(promo_name):
+	promo = get_compiled_promotion(promo_name)
+	return [promo.modified, is_promotion_exhausted(promo)] if promo else None
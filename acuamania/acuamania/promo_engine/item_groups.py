@@ -0,0 +1,74 @@
+import frappe
+
+from acuamania.utils.cache import clear_cached_values, get_cached_value
+
+ITEM_CATEGORY_FIELD = "item_group"
+ITEM_GROUP_TREE_NAMESPACE = "acuamania:item_group_tree"
+
+
+def get_item_group_map(item_codes):
+	"""
+	Resolves item_code -> item_group for the given codes with a single query.
+
+	Built once per apply_selected_promotion call and shared by every
+	promotion row and by the Entrada group check.
+	"""
+	item_codes = [code for code in set(item_codes or []) if code]
+	if not item_codes:
+		return {}
+
+	rows = frappe.get_all(
+		"Item",
+		filters={"name": ["in", item_codes]},
+		fields=["name", ITEM_CATEGORY_FIELD],
+	)
+
+	return {row.name: row.get(ITEM_CATEGORY_FIELD) for row in rows}
+
+
+def get_item_group_tree():
+	"""
+	Cached nested-set snapshot of the Item Group tree:
+	    {"bounds": {name: (lft, rgt)}, "names": {item_group_name: name}}
+
+	Item Group is small and rarely edited, so the whole tree is kept in the
+	worker process and Redis and invalidated from Item Group hooks.
+	"""
+	return get_cached_value(ITEM_GROUP_TREE_NAMESPACE, "tree", _load_item_group_tree)
+
+
+def clear_item_group_tree_cache():
+	clear_cached_values(ITEM_GROUP_TREE_NAMESPACE)
+
+
+def get_item_group_interval(item_group_name):
+	"""
+	Returns the (lft, rgt) interval of an Item Group looked up by
+	item_group_name or docname, or None if it does not exist.
+	"""
+	tree = get_item_group_tree()
+	root_group = tree["names"].get(item_group_name) or item_group_name
+	return tree["bounds"].get(root_group)
+
+
+def is_item_group_within(item_group, interval):
+	"""
+	True when item_group is the root of interval or one of its descendants.
+	"""
+	if not item_group or not interval:
+		return False
+
+	bounds = get_item_group_tree()["bounds"].get(item_group)
+	if not bounds:
+		return False
+
+	return interval[0] <= bounds[0] and bounds[1] <= interval[1]
+
+
+def _load_item_group_tree():
+	rows = frappe.get_all("Item Group", fields=["name", "item_group_name", "lft", "rgt"])
+
+	return {
+		"bounds": {row.name: (row.lft, row.rgt) for row in rows},
+		"names": {row.item_group_name: row.name for row in rows if row.item_group_name},
+	}
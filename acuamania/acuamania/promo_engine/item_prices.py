@@ -0,0 +1,69 @@
+import frappe
+from frappe.utils import flt, getdate
+
+from acuamania.utils.cache import clear_cached_values, get_cached_value
+
+ITEM_PRICE_NAMESPACE = "acuamania:item_prices"
+DEFAULT_SELLING_PRICE_LIST = "Standard Selling"
+
+
+def get_default_selling_price_list():
+	return frappe.db.get_single_value("Selling Settings", "selling_price_list") or DEFAULT_SELLING_PRICE_LIST
+
+
+def get_item_rates(item_codes, price_list, date):
+	"""
+	Returns {item_code: rate} for the codes that have a generic (no customer /
+	supplier) Item Price in price_list valid on date.
+
+	The whole price list is cached (process + Redis) and invalidated from
+	Item Price hooks, so quoting does not query Item Price.
+	"""
+	prices = get_price_list_rates(price_list)
+	ordinal = getdate(date).toordinal()
+	rates = {}
+
+	for code in set(item_codes or []):
+		for valid_from, valid_upto, rate in prices.get(code, ()):
+			started = valid_from is None or valid_from <= ordinal
+			if started and (valid_upto is None or ordinal <= valid_upto):
+				rates[code] = rate
+				break
+
+	return rates
+
+
+def get_price_list_rates(price_list):
+	"""
+	{item_code: [(valid_from, valid_upto, rate)]} with dates as ordinals
+	(None = open-ended), latest valid_from first.
+	"""
+	return get_cached_value(ITEM_PRICE_NAMESPACE, price_list, lambda: _load_price_list_rates(price_list))
+
+
+def clear_item_price_cache(price_list=None):
+	clear_cached_values(ITEM_PRICE_NAMESPACE, price_list)
+
+
+def _load_price_list_rates(price_list):
+	rows = frappe.get_all(
+		"Item Price",
+		filters={"price_list": price_list, "selling": 1},
+		fields=["item_code", "price_list_rate", "valid_from", "valid_upto", "customer", "supplier"],
+		order_by="valid_from desc",
+	)
+
+	prices = {}
+	for row in rows:
+		if row.customer or row.supplier:
+			continue
+
+		prices.setdefault(row.item_code, []).append(
+			(
+				getdate(row.valid_from).toordinal() if row.valid_from else None,
+				getdate(row.valid_upto).toordinal() if row.valid_upto else None,
+				flt(row.price_list_rate),
+			)
+		)
+
+	return prices
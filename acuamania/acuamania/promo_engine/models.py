@@ -0,0 +1,139 @@
+class Promotion:
+	"""
+	Read-only, compiled view of a Park Promotion.
+
+	Holds only what the promo engine needs to price a document, so it can be
+	cached per worker process and in Redis instead of loading the full
+	Park Promotion (parent + child tables) on every save.
+	"""
+
+	__slots__ = (
+		"active",
+		"apply_type",
+		"audience",
+		"bundle",
+		"categories",
+		"default_apply",
+		"discount_amount",
+		"discount_percentage",
+		"fixed_price",
+		"free",
+		"min_qty_required",
+		"modified",
+		"name",
+		"products",
+		"promotion_name",
+		"redemption_cap",
+		"required",
+		"valid_from",
+		"valid_upto",
+	)
+
+	def __init__(self, **fields):
+		self.__setstate__(fields)
+
+	def __setattr__(self, name, value):
+		raise AttributeError(f"Promotion '{self.name}' is read-only")
+
+	def __delattr__(self, name):
+		raise AttributeError(f"Promotion '{self.name}' is read-only")
+
+	def __reduce__(self):
+		# pickled by field name, so promotions cached before a slot is added
+		# or removed still load (missing fields are None, unknown ones dropped)
+		return (self.__class__, (), {fieldname: getattr(self, fieldname) for fieldname in self.__slots__})
+
+	def __setstate__(self, fields):
+		for fieldname in self.__slots__:
+			object.__setattr__(self, fieldname, fields.get(fieldname))
+
+	def pricing_values(self):
+		"""
+		Every field that can change a price (everything but name and modified).
+		"""
+		return tuple(
+			getattr(self, fieldname) for fieldname in self.__slots__ if fieldname not in ("name", "modified")
+		)
+
+	def __repr__(self):
+		return f"Promotion({self.name!r}, apply_type={self.apply_type!r})"
+
+
+class Line:
+	"""
+	One priced document line: item_code, qty, rate and the item's item_group.
+
+	index is the line's position in its Cart (set by Cart), so the units a
+	rule touches can be traced back to cart lines.
+	"""
+
+	__slots__ = ("index", "item_code", "item_group", "qty", "rate")
+
+	def __init__(self, item_code, qty, rate, item_group=None, index=None):
+		self.item_code = item_code
+		self.qty = qty
+		self.rate = rate
+		self.item_group = item_group
+		self.index = index
+
+	def __repr__(self):
+		return f"Line({self.item_code!r}, qty={self.qty!r}, rate={self.rate!r})"
+
+
+class Cart:
+	"""
+	The lines to price plus the transaction date they are priced on and
+	the customer categories of the buyer (used by audience promotions).
+	"""
+
+	__slots__ = ("customer_categories", "lines", "transaction_date")
+
+	def __init__(self, lines, transaction_date=None, customer_categories=None):
+		self.lines = list(lines)
+		for index, line in enumerate(self.lines):
+			line.index = index
+		self.transaction_date = transaction_date
+		self.customer_categories = frozenset(customer_categories or ())
+
+
+class PromotionResult:
+	"""
+	Outcome of one promotion on a cart.
+
+	applied_name is empty when the promotion is missing or inactive.
+	qty is None when the promotion was not evaluated (no applicable items).
+	units holds {Line: units} of the cart lines the promotion touched
+	(Line.index is the position in the cart) and allocation
+	{line index: discount} once the discount is allocated.
+	"""
+
+	__slots__ = ("allocation", "applied_name", "discount", "promotion", "qty", "units")
+
+	def __init__(self, promotion=None, applied_name="", discount=0, qty=None):
+		self.promotion = promotion
+		self.applied_name = applied_name
+		self.discount = discount
+		self.qty = qty
+		self.units = None
+		self.allocation = {}
+
+
+class PricingResult:
+	"""
+	One PromotionResult per requested promotion (same order) and their total discount.
+
+	line_discounts is aligned with the cart lines: the share of the total
+	discount allocated to each line (cents add up to total_discount).
+
+	budget_exceeded is set when the exclusive optimizer ran out of time and
+	left some promotions unassigned.
+	"""
+
+	__slots__ = ("budget_exceeded", "line_discounts", "mode", "promotions", "total_discount")
+
+	def __init__(self, promotions, total_discount=0, mode=None, budget_exceeded=False, line_discounts=None):
+		self.promotions = promotions
+		self.total_discount = total_discount
+		self.mode = mode
+		self.budget_exceeded = budget_exceeded
+		self.line_discounts = line_discounts or []
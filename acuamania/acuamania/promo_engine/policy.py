@@ -0,0 +1,29 @@
+import frappe
+from frappe.utils import cstr, flt
+
+from acuamania.acuamania.promo_engine.core import DEFAULT_TIME_BUDGET_MS, PRICING_MODE_STACK, PRICING_MODES
+
+# site_config.json keys
+PRICING_MODE_CONF_KEY = "acuamania_promo_mode"
+MAX_DISCOUNT_PERCENTAGE_CONF_KEY = "acuamania_promo_max_discount_percentage"
+TIME_BUDGET_CONF_KEY = "acuamania_promo_time_budget_ms"
+
+
+def get_pricing_policy():
+	"""
+	Pricing policy from site config:
+	    - acuamania_promo_mode: "stack" (default, discounts are summed) or
+	      "exclusive" (each unit goes to at most one promotion)
+	    - acuamania_promo_max_discount_percentage: cap on the total discount
+	      as a share of the cart amount (0 = no cap)
+	    - acuamania_promo_time_budget_ms: time budget of the exclusive optimizer
+	"""
+	mode = cstr(frappe.conf.get(PRICING_MODE_CONF_KEY)) or PRICING_MODE_STACK
+	if mode not in PRICING_MODES:
+		mode = PRICING_MODE_STACK
+
+	return {
+		"mode": mode,
+		"max_discount_percentage": flt(frappe.conf.get(MAX_DISCOUNT_PERCENTAGE_CONF_KEY)),
+		"time_budget_ms": flt(frappe.conf.get(TIME_BUDGET_CONF_KEY)) or DEFAULT_TIME_BUDGET_MS,
+	}
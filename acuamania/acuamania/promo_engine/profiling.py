@@ -0,0 +1,171 @@
+import json
+import time
+from contextlib import contextmanager, nullcontext
+
+import frappe
+from frappe.utils import cint, now
+
+PROFILING_CONF_KEY = "acuamania_promo_profiling"
+PROFILE_BUFFER_KEY = "acuamania:promo_engine_profiles"
+PROFILE_BUFFER_SIZE = 200
+
+_DISABLED_PHASE = nullcontext()
+
+
+def is_profiling_enabled():
+	return bool(cint(frappe.conf.get(PROFILING_CONF_KEY)))
+
+
+@contextmanager
+def profile_document(doc):
+	"""
+	Profiles one apply_selected_promotion call when site config
+	acuamania_promo_profiling is set; otherwise does nothing.
+
+	The record (wall time and SQL count per phase and per promotion row) is
+	pushed to a Redis ring buffer of the last PROFILE_BUFFER_SIZE calls.
+	"""
+	if not is_profiling_enabled() or getattr(frappe.local, "promo_profiler", None):
+		yield
+		return
+
+	profiler = PromoProfiler(doc)
+	frappe.local.promo_profiler = profiler
+	try:
+		with count_queries() as counter:
+			profiler.counter = counter
+			yield
+	finally:
+		frappe.local.promo_profiler = None
+		profiler.save()
+
+
+def phase(name):
+	"""
+	Context manager timing one phase of the current profiled call.
+	A shared no-op when profiling is off.
+	"""
+	profiler = getattr(frappe.local, "promo_profiler", None)
+	if not profiler:
+		return _DISABLED_PHASE
+
+	return profiler.phase(name)
+
+
+def promotion_phase(promotion, kind):
+	"""
+	Like phase(), but records "<kind>_ms" / "<kind>_queries" on the entry of
+	one promotion row.
+	"""
+	profiler = getattr(frappe.local, "promo_profiler", None)
+	if not profiler:
+		return _DISABLED_PHASE
+
+	return profiler.promotion_phase(promotion, kind)
+
+
+def get_profiler():
+	return getattr(frappe.local, "promo_profiler", None)
+
+
+class PromoProfiler:
+	def __init__(self, doc):
+		self.record = {
+			"doctype": doc.doctype,
+			"name": doc.name,
+			"at": now(),
+			"phases": [],
+			"promotions": [],
+		}
+		self.counter = {"count": 0}
+		self.started = time.perf_counter()
+
+	@contextmanager
+	def phase(self, name):
+		entry = {"phase": name}
+		self.record["phases"].append(entry)
+
+		with self._measure(entry, "ms", "queries"):
+			yield
+
+	@contextmanager
+	def promotion_phase(self, promotion, kind):
+		with self._measure(self._promotion_entry(promotion), f"{kind}_ms", f"{kind}_queries"):
+			yield
+
+	def add_promotion_metrics(self, promotion, **metrics):
+		self._promotion_entry(promotion).update(metrics)
+
+	def _promotion_entry(self, promotion):
+		for entry in self.record["promotions"]:
+			if entry["promotion"] == promotion:
+				return entry
+
+		entry = {"promotion": promotion}
+		self.record["promotions"].append(entry)
+		return entry
+
+	@contextmanager
+	def _measure(self, entry, time_key, query_key):
+		start = time.perf_counter()
+		queries = self.counter["count"]
+		try:
+			yield
+		finally:
+			entry[time_key] = round((time.perf_counter() - start) * 1000, 3)
+			entry[query_key] = self.counter["count"] - queries
+
+	def save(self):
+		self.record["total_ms"] = round((time.perf_counter() - self.started) * 1000, 3)
+		self.record["queries"] = self.counter["count"]
+
+		try:
+			frappe.cache().lpush(PROFILE_BUFFER_KEY, json.dumps(self.record, default=str))
+			frappe.cache().ltrim(PROFILE_BUFFER_KEY, 0, PROFILE_BUFFER_SIZE - 1)
+		except Exception:
+			frappe.logger("promo_engine").exception("Could not store promo engine profile")
+
+
+@frappe.whitelist()
+def get_promo_engine_profiles(limit=50, doctype=None, name=None):
+	"""
+	Latest profiled apply_selected_promotion calls, newest first.
+	"""
+	frappe.only_for("System Manager")
+
+	limit = max(1, min(cint(limit) or 50, PROFILE_BUFFER_SIZE))
+	records = [
+		json.loads(raw) for raw in frappe.cache().lrange(PROFILE_BUFFER_KEY, 0, PROFILE_BUFFER_SIZE - 1)
+	]
+
+	if doctype:
+		records = [record for record in records if record["doctype"] == doctype]
+	if name:
+		records = [record for record in records if record["name"] == name]
+
+	return records[:limit]
+
+
+@frappe.whitelist()
+def clear_promo_engine_profiles():
+	frappe.only_for("System Manager")
+	frappe.cache().delete_value(PROFILE_BUFFER_KEY)
+
+
+@contextmanager
+def count_queries():
+	"""
+	Counts frappe.db.sql calls made inside the block.
+	"""
+	counter = {"count": 0}
+	original_sql = frappe.db.sql
+
+	def counting_sql(*args, **kwargs):
+		counter["count"] += 1
+		return original_sql(*args, **kwargs)
+
+	frappe.db.sql = counting_sql
+	try:
+		yield counter
+	finally:
+		frappe.db.sql = original_sql
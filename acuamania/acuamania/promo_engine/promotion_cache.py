@@ -0,0 +1,145 @@
+import frappe
+from frappe.utils import cint, flt
+
+from acuamania.acuamania.promo_engine.models import Promotion
+from acuamania.utils.cache import clear_cached_values, get_cached_value
+
+PROMOTION_CACHE_NAMESPACE = "acuamania:compiled_park_promotion"
+
+
+def get_compiled_promotion(promo_name):
+	"""
+	Returns the compiled Promotion for a Park Promotion name, or None if it does not exist.
+	"""
+	if not promo_name:
+		return None
+
+	return get_cached_value(
+		PROMOTION_CACHE_NAMESPACE,
+		promo_name,
+		lambda: _load_and_compile(promo_name),
+	)
+
+
+def clear_promotion_cache(promo_name=None):
+	"""
+	Drops one compiled promotion (or all of them) from Redis and every worker process.
+	"""
+	clear_cached_values(PROMOTION_CACHE_NAMESPACE, promo_name)
+
+
+def compile_promotion(promo_doc):
+	"""
+	Builds an immutable Promotion from a Park Promotion document.
+
+	Combo promotions take required / free and the bundle from their Combo
+	Promotion; its modified is part of the version so combo edits re-price.
+	The audience (customer categories) comes from the Promotion Audience
+	Group the same way.
+	"""
+	required = cint(promo_doc.required)
+	free = cint(promo_doc.free)
+	bundle = ()
+	modified = str(promo_doc.modified or "")
+
+	if promo_doc.apply_type == "combo":
+		required, free, bundle, combo_modified = _compile_combo(promo_doc.get("combo_promotion"))
+		modified = f"{modified}|{combo_modified}"
+
+	audience, audience_modified = _compile_audience(promo_doc.get("audience_group"))
+	if audience_modified:
+		modified = f"{modified}|{audience_modified}"
+
+	return Promotion(
+		name=promo_doc.name,
+		promotion_name=promo_doc.promotion_name,
+		active=cint(promo_doc.active),
+		apply_type=promo_doc.apply_type,
+		required=required,
+		free=free,
+		fixed_price=flt(promo_doc.fixed_price),
+		discount_percentage=flt(promo_doc.discount_percentage),
+		discount_amount=flt(promo_doc.discount_amount),
+		min_qty_required=cint(promo_doc.get("min_qty_required")),
+		valid_from=promo_doc.get("valid_from"),
+		valid_upto=promo_doc.get("valid_upto"),
+		default_apply=cint(promo_doc.get("default_apply")),
+		products=frozenset(row.product for row in promo_doc.get("park_promotion_items") or [] if row.product),
+		categories=frozenset(
+			row.category for row in promo_doc.get("applicable_categories") or [] if row.category
+		),
+		modified=modified,
+		bundle=bundle,
+		redemption_cap=cint(promo_doc.get("redemption_cap")),
+		audience=audience,
+	)
+
+
+def get_promotions_using_combo(combo_name):
+	return frappe.get_all("Park Promotion", filters={"combo_promotion": combo_name}, pluck="name")
+
+
+def get_promotions_using_audience_group(group_name):
+	return frappe.get_all("Park Promotion", filters={"audience_group": group_name}, pluck="name")
+
+
+def _compile_combo(combo_name):
+	"""
+	(required, free, bundle, modified) of a Combo Promotion, where bundle is a
+	sorted tuple of (item_code, units) pairs.
+	"""
+	if not combo_name:
+		return 0, 0, (), ""
+
+	try:
+		combo = frappe.get_doc("Combo Promotion", combo_name)
+	except frappe.DoesNotExistError:
+		return 0, 0, (), ""
+
+	return (*combo_pricing_values(combo), str(combo.modified or ""))
+
+
+def combo_pricing_values(combo):
+	"""
+	(required, free, bundle) of a Combo Promotion document: what its
+	promotions are priced with.
+	"""
+	units = {}
+	for row in combo.get("combos_promotion_items") or []:
+		if row.product:
+			units[row.product] = units.get(row.product, 0) + 1
+
+	return cint(combo.required), cint(combo.free), tuple(sorted(units.items()))
+
+
+def _compile_audience(group_name):
+	"""
+	(customer categories, modified) of a Promotion Audience Group.
+	"""
+	if not group_name:
+		return frozenset(), ""
+
+	try:
+		group = frappe.get_doc("Promotion Audience Group", group_name)
+	except frappe.DoesNotExistError:
+		return frozenset(), ""
+
+	return audience_categories(group), str(group.modified or "")
+
+
+def audience_categories(group):
+	"""
+	Customer categories of a Promotion Audience Group document.
+	"""
+	return frozenset(
+		row.customer_category for row in group.get("customer_categories") or [] if row.customer_category
+	)
+
+
+def _load_and_compile(promo_name):
+	try:
+		promo_doc = frappe.get_doc("Park Promotion", promo_name)
+	except frappe.DoesNotExistError:
+		return None
+
+	return compile_promotion(promo_doc)
@@ -0,0 +1,169 @@
+import frappe
+from frappe.utils import cint
+
+from acuamania.acuamania.promo_engine.promotion_cache import get_compiled_promotion
+
+REDEMPTION_KEY_PREFIX = "acuamania:promotion_redemptions:"
+
+# DECRBY that never takes a counter below 0
+FLOORED_DECRBY = """
+local count = redis.call('DECRBY', KEYS[1], ARGV[1])
+if count < 0 then
+	redis.call('SET', KEYS[1], 0)
+	return 0
+end
+return count
+"""
+
+
+def get_redemption_count(promo_name):
+	"""
+	Units redeemed with a promotion on submitted Sales Orders, read from its
+	Redis counter (no database access; a missing counter reads as 0).
+	"""
+	return cint(frappe.cache().get(_redemption_key(promo_name)))
+
+
+def is_promotion_exhausted(promo):
+	"""
+	True when a compiled promotion has a redemption cap and reached it.
+	"""
+	if not promo or not promo.redemption_cap:
+		return False
+
+	return get_redemption_count(promo.name) >= promo.redemption_cap
+
+
+def reserve_redemptions(doc, method=None):
+	"""
+	Sales Order before_submit: atomically adds the units of every applied
+	capped promotion to its counter and refuses the submit when a cap is
+	exceeded.
+
+	Counters are given back if the transaction is rolled back.
+	"""
+	reserved = []
+
+	try:
+		for promo_name, units in get_capped_units(doc).items():
+			promo = get_compiled_promotion(promo_name)
+			_seed_counter(promo_name)
+
+			count = frappe.cache().incrby(_redemption_key(promo_name), units)
+			reserved.append((promo_name, units))
+
+			if count > promo.redemption_cap:
+				frappe.throw(
+					f"La promoción {promo.promotion_name or promo_name} alcanzó su límite de "
+					f"{promo.redemption_cap} canjes (disponibles: {max(promo.redemption_cap - count + units, 0)})."
+				)
+	except Exception:
+		_release(reserved)
+		raise
+
+	frappe.db.after_rollback.add(lambda: _release(reserved))
+
+
+def release_redemptions(doc, method=None):
+	"""
+	Sales Order on_cancel: gives back the units counted on submit.
+	"""
+	released = list(get_capped_units(doc).items())
+	for promo_name, _units in released:
+		_seed_counter(promo_name)
+
+	_release(released)
+	frappe.db.after_rollback.add(lambda: _reserve(released))
+
+
+def get_redeemed_units(doc):
+	"""
+	{promotion: units} of the promotion rows that gave a discount.
+	"""
+	units = {}
+	for row in doc.get("custom_promotion_table") or []:
+		if row.promotion and (row.discount or 0) > 0 and cint(row.qty) > 0:
+			units[row.promotion] = units.get(row.promotion, 0) + cint(row.qty)
+	return units
+
+
+def get_capped_units(doc):
+	"""
+	get_redeemed_units restricted to promotions with a redemption cap; the
+	others have no counter.
+	"""
+	units = {}
+	for promo_name, promo_units in get_redeemed_units(doc).items():
+		promo = get_compiled_promotion(promo_name)
+		if promo and promo.redemption_cap:
+			units[promo_name] = promo_units
+	return units
+
+
+def reconcile_redemption_counts():
+	"""
+	Daily job: corrects every counter of a capped promotion from submitted
+	Sales Orders with one aggregate query over custom_promotion_table.
+
+	The correction is applied as a delta against the value read before the
+	query, so submits and cancels that move a counter meanwhile are kept.
+	"""
+	promo_names = frappe.get_all("Park Promotion", filters={"redemption_cap": [">", 0]}, pluck="name")
+	before = {promo_name: frappe.cache().get(_redemption_key(promo_name)) for promo_name in promo_names}
+	counts = get_redemption_counts_from_db()
+
+	for promo_name in promo_names:
+		key = _redemption_key(promo_name)
+		count = counts.get(promo_name, 0)
+
+		if before[promo_name] is None:
+			frappe.cache().set(key, count, nx=True)
+		elif count != cint(before[promo_name]):
+			frappe.cache().incrby(key, count - cint(before[promo_name]))
+
+
+def get_redemption_counts_from_db(promo_name=None):
+	condition = "and sel.promotion = %(promotion)s" if promo_name else ""
+
+	rows = frappe.db.sql(
+		f"""
+		select sel.promotion, sum(sel.qty)
+		from `tabPark Promotion Selection` sel
+		inner join `tabSales Order` sales_order on sales_order.name = sel.parent
+		where sel.parenttype = 'Sales Order'
+			and sel.parentfield = 'custom_promotion_table'
+			and sales_order.docstatus = 1
+			and sel.discount > 0
+			and sel.qty > 0
+			{condition}
+		group by sel.promotion
+		""",
+		{"promotion": promo_name},
+	)
+
+	return {promotion: cint(units) for promotion, units in rows}
+
+
+def _seed_counter(promo_name):
+	# a counter lost with Redis is rebuilt from the database before it is trusted
+	key = _redemption_key(promo_name)
+	if frappe.cache().get(key) is not None:
+		return
+
+	count = get_redemption_counts_from_db(promo_name).get(promo_name, 0)
+	frappe.cache().set(key, count, nx=True)
+
+
+def _release(reservations):
+	for promo_name, units in reservations:
+		frappe.cache().eval(FLOORED_DECRBY, 1, _redemption_key(promo_name), units)
+
+
+def _reserve(reservations):
+	for promo_name, units in reservations:
+		frappe.cache().incrby(_redemption_key(promo_name), units)
+
+
+def _redemption_key(promo_name):
+	# site-prefixed raw key: counters use plain Redis integers (INCRBY / FLOORED_DECRBY)
+	return frappe.cache().make_key(f"{REDEMPTION_KEY_PREFIX}{promo_name}")
@@ -0,0 +1,163 @@
+import frappe
+from frappe.utils import flt
+
+from acuamania.acuamania.promo_engine.engine import reprice_document
+from acuamania.acuamania.promo_engine.fingerprint import set_pricing_fingerprint
+
+REPRICE_JOB_METHOD = "acuamania.acuamania.promo_engine.repricing.reprice_drafts_for_promotion"
+REPRICE_QUEUE = "long"
+REPRICE_TIMEOUT = 60 * 60
+REPRICE_CHUNK_SIZE = 100
+REPRICE_SAVEPOINT = "promo_reprice_draft"
+
+
+def enqueue_draft_repricing(promo_name):
+	"""
+	Queues the re-pricing of every open draft that references promo_name.
+	One job per promotion; runs after the current transaction commits.
+	"""
+	frappe.enqueue(
+		REPRICE_JOB_METHOD,
+		queue=REPRICE_QUEUE,
+		timeout=REPRICE_TIMEOUT,
+		job_id=f"acuamania-reprice-drafts::{frappe.local.site}::{promo_name}",
+		deduplicate=True,
+		enqueue_after_commit=True,
+		promo_name=promo_name,
+	)
+
+
+def reprice_drafts_for_promotion(promo_name, chunk_size=REPRICE_CHUNK_SIZE):
+	"""
+	Background job: re-prices draft Quotations / Sales Orders that use promo_name.
+
+	Only documents whose discounts actually change are written, chunk by chunk,
+	with a commit after each chunk. Progress is published in realtime and all
+	failures are reported in a single Error Log at the end.
+	"""
+	drafts = get_draft_documents_for_promotion(promo_name)
+	total = len(drafts)
+	updated = 0
+	failures = []
+
+	for start in range(0, total, chunk_size):
+		for doctype, name in drafts[start : start + chunk_size]:
+			frappe.db.savepoint(REPRICE_SAVEPOINT)
+			try:
+				if reprice_draft(doctype, name):
+					updated += 1
+			except Exception:
+				frappe.db.rollback(save_point=REPRICE_SAVEPOINT)
+				failures.append(f"{doctype} {name}\n{frappe.get_traceback()}")
+
+		frappe.db.commit()
+
+		done = min(start + chunk_size, total)
+		frappe.publish_progress(
+			done * 100 / total,
+			title=f"Recalculando borradores: {promo_name}",
+			description=f"{done}/{total}",
+		)
+
+	summary = {"promotion": promo_name, "drafts": total, "updated": updated, "failed": len(failures)}
+
+	if failures:
+		frappe.log_error(
+			title=f"Promotion re-pricing failed ({len(failures)}/{total}): {promo_name}",
+			message="\n\n".join(failures),
+		)
+
+	frappe.logger("promo_engine").info(f"Draft re-pricing finished: {summary}")
+	return summary
+
+
+def get_draft_documents_for_promotion(promo_name):
+	"""
+	Returns [(doctype, name)] of draft Quotations / Sales Orders referencing
+	promo_name in custom_promotion_table, using one query over the indexed
+	Park Promotion Selection.promotion column.
+	"""
+	rows = frappe.db.sql(
+		"""
+		select distinct sel.parenttype, sel.parent
+		from `tabPark Promotion Selection` sel
+		left join `tabQuotation` quotation
+			on sel.parenttype = 'Quotation' and quotation.name = sel.parent
+		left join `tabSales Order` sales_order
+			on sel.parenttype = 'Sales Order' and sales_order.name = sel.parent
+		where sel.promotion = %(promotion)s
+			and sel.parentfield = 'custom_promotion_table'
+			and (quotation.docstatus = 0 or sales_order.docstatus = 0)
+		order by sel.parenttype, sel.parent
+		""",
+		{"promotion": promo_name},
+	)
+
+	return [(doctype, name) for doctype, name in rows]
+
+
+def reprice_draft(doctype, name):
+	"""
+	Re-prices one draft with the promo engine. When its discounts changed,
+	writes back only the columns that changed (parent totals, promotion rows,
+	item discounts) and deletes the rows it removed, without hooks and
+	without touching modified.
+
+	Returns True when the document was updated.
+	"""
+	doc = frappe.get_doc(doctype, name)
+	before = _discount_snapshot(doc)
+	columns_before = _column_snapshot(doc)
+
+	reprice_document(doc)
+	set_pricing_fingerprint(doc)
+
+	if _discount_snapshot(doc) == before:
+		return False
+
+	_write_changed_columns(doc, columns_before)
+	return True
+
+
+def _write_changed_columns(doc, columns_before):
+	# rows removed in memory (doc.remove) leave gaps in idx
+	for df in doc.meta.get_table_fields():
+		for idx, row in enumerate(doc.get(df.fieldname) or [], start=1):
+			row.idx = idx
+
+	rows = [doc, *doc.get_all_children()]
+	for row in rows:
+		previous = columns_before.get((row.doctype, row.name))
+		if previous is None:
+			row.db_insert()
+			continue
+
+		changed = {
+			fieldname: value
+			for fieldname, value in row.get_valid_dict(convert_dates_to_str=True, ignore_virtual=True).items()
+			if value != previous.get(fieldname)
+		}
+		if changed:
+			frappe.db.set_value(row.doctype, row.name, changed, update_modified=False)
+
+	kept = {(row.doctype, row.name) for row in rows}
+	for doctype, name in columns_before:
+		if (doctype, name) not in kept:
+			frappe.db.delete(doctype, {"name": name})
+
+
+def _column_snapshot(doc):
+	return {
+		(row.doctype, row.name): row.get_valid_dict(convert_dates_to_str=True, ignore_virtual=True)
+		for row in [doc, *doc.get_all_children()]
+	}
+
+
+def _discount_snapshot(doc):
+	return (
+		flt(doc.discount_amount, 2),
+		tuple(
+			(row.promotion, flt(row.discount, 2), row.qty, row.applied_name)
+			for row in doc.get("custom_promotion_table") or []
+		),
+	)
@@ -2,11 +2,7 @@ def resolve_applicable_item_codes(promo, items_by_code):
 	"""
 	Get which item codes are elegibles
 	"""
-	explicit_codes = {
-		row.product
-		for row in getattr(promo, "park_promotion_items", []) or []
-		if getattr(row, "product", None)
-	}
+	explicit_codes = promo.products
 
 	if explicit_codes:
 		return [code for code in explicit_codes if code in items_by_code]
@@ -14,36 +10,44 @@ def resolve_applicable_item_codes(promo, items_by_code):
 	return list(items_by_code.keys())
 
 
-def apply_required_x_free(promo, items_by_code):
+def apply_required_x_free(promo, items_by_code, touched=None):
 	"""
 	Applies a 'required x free' promotion.
 
 	Returns:
 	    (discount_amount, applied_qty)
 	where applied_qty is the number of free units granted.
+
+	Every rule takes an optional touched dict and adds to it {row: units}
+	for the units it used (here the cheapest complete groups of 'required'
+	units), so discounts can be allocated without pricing twice.
 	"""
 	required_qty, free_qty = _get_required_and_free_qty(promo)
 	if not _is_valid_required_free(required_qty, free_qty):
 		return 0, 0
 
-	unit_prices = _extract_unit_prices(items_by_code)
-	total_units = len(unit_prices)
+	unit_runs = _extract_unit_runs(items_by_code)
+	total_units = sum(unit_runs.values())
 
 	free_units = _calculate_free_units(total_units, required_qty, free_qty)
 	if free_units <= 0:
 		return 0, 0
 
-	discount = _sum_cheapest_units(unit_prices, free_units)
+	discount = _sum_cheapest_units(unit_runs, free_units)
+	if touched is not None:
+		grouped_units = (total_units // required_qty) * required_qty
+		_take_cheapest_units([row for rows in items_by_code.values() for row in rows], grouped_units, touched)
+
 	return discount, free_units
 
 
-def apply_fixed_price(promo, items_by_code):
+def apply_fixed_price(promo, items_by_code, touched=None):
 	"""
 	Applies a fixed price promotion.
 
 	Returns:
 	    (discount_amount, applied_qty)
-	where applied_qty is the number of units discounted.
+	where applied_qty is the number of units discounted (the touched ones).
 	"""
 	if not promo.fixed_price:
 		return 0, 0
@@ -64,17 +68,20 @@ def apply_fixed_price(promo, items_by_code):
 			unit_discount = row.rate - promo.fixed_price
 			total_discount += unit_discount * row.qty
 			applied_qty += row.qty
+			if touched is not None:
+				touched[row] = touched.get(row, 0) + row.qty
 
 	return total_discount, applied_qty
 
 
-def apply_percentage_discount(promo, items_by_code):
+def apply_percentage_discount(promo, items_by_code, touched=None):
 	"""
 	Applies a percentage discount promotion.
 
 	Returns:
 	    (discount_amount, applied_qty)
-	where applied_qty is the number of units included in the discount base.
+	where applied_qty is the number of units included in the discount base
+	(the touched ones).
 	"""
 	if not promo.discount_percentage:
 		return 0, 0
@@ -91,6 +98,8 @@ def apply_percentage_discount(promo, items_by_code):
 
 			base_amount += row.qty * row.rate
 			applied_qty += row.qty
+			if touched is not None:
+				touched[row] = touched.get(row, 0) + row.qty
 
 	if not base_amount:
 		return 0, 0
@@ -99,26 +108,79 @@ def apply_percentage_discount(promo, items_by_code):
 	return discount, applied_qty
 
 
-def apply_discount_amount(promo, items_by_code):
+def apply_discount_amount(promo, items_by_code, touched=None):
 	"""
 	Applies a flat discount amount promotion.
 
 	Returns:
 	    (discount_amount, applied_qty)
-	applied_qty is always 1 if at least one applicable item exists.
+	applied_qty is always 1 if at least one applicable item exists. The
+	touched unit is the cheapest priced one (any unit when none is priced).
 	"""
 	if not promo.discount_amount:
 		return 0, 0
 
 	applicable_codes = resolve_applicable_item_codes(promo, items_by_code)
-	has_items = any(items_by_code.get(code) for code in applicable_codes)
+	rows = [row for code in applicable_codes for row in items_by_code.get(code, [])]
 
-	if not has_items:
+	if not rows:
 		return 0, 0
 
+	if touched is not None:
+		row = min(_priced_rows(rows), key=lambda row: row.rate, default=None)
+		row = row or next((row for row in rows if row.qty and row.qty > 0), None)
+		if row:
+			touched[row] = touched.get(row, 0) + min(1, row.qty)
+
 	return promo.discount_amount, 1
 
 
+def apply_combo(promo, items_by_code, touched=None):
+	"""
+	Applies a combo promotion. promo.bundle holds one combo as (item_code, units)
+	pairs; every complete combo in the cart gives away its 'free' cheapest units
+	once at least 'required' combos (default 1) are present.
+
+	Returns:
+	    (discount_amount, applied_qty)
+	where applied_qty is the number of free units granted. The touched units
+	are the cheapest units of every complete combo.
+	"""
+	bundle = dict(promo.bundle or ())
+	free_per_bundle = min(int(promo.free or 0), sum(bundle.values()))
+	if not bundle or free_per_bundle <= 0:
+		return 0, 0
+
+	bundles = count_complete_bundles(bundle, items_by_code)
+	if bundles <= 0 or bundles < int(promo.required or 0):
+		return 0, 0
+
+	unit_runs = _extract_bundle_unit_runs(bundle, bundles, items_by_code, touched)
+	free_units = bundles * free_per_bundle
+
+	return _sum_cheapest_units(unit_runs, free_units), free_units
+
+
+def count_complete_bundles(bundle, items_by_code):
+	"""
+	How many complete bundles ({item_code: units}) the cart holds.
+
+	Counts units per code instead of matching units one by one:
+	O(lines + bundle size).
+	"""
+	bundles = None
+
+	for code, needed in bundle.items():
+		available = sum(int(row.qty) for row in _priced_rows(items_by_code.get(code, [])))
+		complete = available // needed
+		bundles = complete if bundles is None else min(bundles, complete)
+
+		if not bundles:
+			return 0
+
+	return bundles or 0
+
+
 def _get_required_and_free_qty(promo):
 	return int(promo.required or 0), int(promo.free or 0)
 
@@ -127,11 +189,13 @@ def _is_valid_required_free(required_qty, free_qty):
 	return required_qty > 0 and free_qty > 0
 
 
-def _extract_unit_prices(items_by_code):
+def _extract_unit_runs(items_by_code):
 	"""
-	Flattens all item rows into individual unit prices, quantity-aware.
+	Collapses all item rows into {rate: units} runs, quantity-aware.
+
+	Memory is O(distinct rates) instead of O(units).
 	"""
-	unit_prices = []
+	unit_runs = {}
 
 	for rows in items_by_code.values():
 		for row in rows:
@@ -141,9 +205,50 @@ def _extract_unit_prices(items_by_code):
 			if qty <= 0 or rate <= 0:
 				continue
 
-			unit_prices.extend([rate] * qty)
+			unit_runs[rate] = unit_runs.get(rate, 0) + qty
+
+	return unit_runs
+
+
+def _extract_bundle_unit_runs(bundle, bundles, items_by_code, touched=None):
+	"""
+	{rate: units} runs of the units that make up the complete bundles, taking
+	the cheapest units of each code (added to touched when given).
+	"""
+	unit_runs = {}
+
+	for code, needed in bundle.items():
+		remaining = bundles * needed
+
+		for row in sorted(_priced_rows(items_by_code.get(code, [])), key=lambda row: row.rate):
+			if remaining <= 0:
+				break
+
+			taken = min(int(row.qty), remaining)
+			rate = float(row.rate)
+			unit_runs[rate] = unit_runs.get(rate, 0) + taken
+			remaining -= taken
+			if touched is not None:
+				touched[row] = touched.get(row, 0) + taken
+
+	return unit_runs
 
-	return unit_prices
+
+def _take_cheapest_units(rows, units, touched):
+	"""
+	Adds the cheapest `units` priced units of rows to touched.
+	"""
+	for row in sorted(_priced_rows(rows), key=lambda row: row.rate):
+		if units <= 0:
+			break
+
+		taken = min(int(row.qty), units)
+		touched[row] = touched.get(row, 0) + taken
+		units -= taken
+
+
+def _priced_rows(rows):
+	return [row for row in rows if (row.qty or 0) >= 1 and (row.rate or 0) > 0]
 
 
 def _calculate_free_units(total_units, required_qty, free_qty):
@@ -153,6 +258,19 @@ def _calculate_free_units(total_units, required_qty, free_qty):
 	return (total_units // required_qty) * free_qty
 
 
-def _sum_cheapest_units(unit_prices, free_units):
-	unit_prices.sort()
-	return sum(unit_prices[:free_units])
+def _sum_cheapest_units(unit_runs, free_units):
+	"""
+	Sums the cheapest free_units units by walking the runs in rate order.
+	"""
+	total = 0
+	remaining = free_units
+
+	for rate in sorted(unit_runs):
+		if remaining <= 0:
+			break
+
+		taken = min(unit_runs[rate], remaining)
+		total += rate * taken
+		remaining -= taken
+
+	return total
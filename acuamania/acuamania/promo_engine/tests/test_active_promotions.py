@@ -0,0 +1,69 @@
+import unittest
+
+from acuamania.acuamania.promo_engine.active_promotions import ActivePromotionIndex
+
+
+def make_index():
+	return ActivePromotionIndex.build(
+		[
+			{"name": "Verano", "valid_from": "2025-12-01 00:00:00", "valid_upto": "2026-02-28 23:59:59"},
+			{"name": "Enero", "valid_from": "2026-01-01", "valid_upto": "2026-01-31", "default_apply": 1},
+			{"name": "Siempre", "valid_from": None, "valid_upto": None, "default_apply": 1},
+			{"name": "Hasta Navidad", "valid_from": None, "valid_upto": "2025-12-25"},
+		]
+	)
+
+
+class TestActivePromotionIndex(unittest.TestCase):
+	def test_valid_on_dates(self):
+		index = make_index()
+
+		self.assertEqual(index.valid_on("2025-11-30"), {"Siempre", "Hasta Navidad"})
+		self.assertEqual(index.valid_on("2025-12-01"), {"Siempre", "Hasta Navidad", "Verano"})
+		self.assertEqual(index.valid_on("2025-12-26"), {"Siempre", "Verano"})
+		self.assertEqual(index.valid_on("2026-01-15"), {"Siempre", "Verano", "Enero"})
+		self.assertEqual(index.valid_on("2026-02-28"), {"Siempre", "Verano"})
+		self.assertEqual(index.valid_on("2026-03-01"), {"Siempre"})
+
+	def test_validity_bounds_are_inclusive(self):
+		index = make_index()
+
+		self.assertIn("Enero", index.valid_on("2026-01-01"))
+		self.assertIn("Enero", index.valid_on("2026-01-31"))
+		self.assertNotIn("Enero", index.valid_on("2026-02-01"))
+
+	def test_default_apply_on(self):
+		index = make_index()
+
+		self.assertEqual(index.default_apply_on("2026-01-10"), {"Siempre", "Enero"})
+		self.assertEqual(index.default_apply_on("2026-03-01"), {"Siempre"})
+
+	def test_empty_index(self):
+		self.assertEqual(ActivePromotionIndex.build([]).valid_on("2026-01-01"), frozenset())
+
+
+class TestGroupTiers(unittest.TestCase):
+	def make_index(self):
+		return ActivePromotionIndex.build(
+			[
+				{"name": "Grupo 16", "valid_from": None, "valid_upto": None, "group_min_qty": 16},
+				{"name": "Grupo 50", "valid_from": None, "valid_upto": None, "group_min_qty": 50},
+				{"name": "Grupo 200", "valid_from": "2026-01-01", "valid_upto": None, "group_min_qty": 200},
+				{"name": "Sin Escalón", "valid_from": None, "valid_upto": None},
+			]
+		)
+
+	def test_tier_by_quantity(self):
+		index = self.make_index()
+
+		self.assertIsNone(index.group_tier_on("2026-02-01", 15))
+		self.assertEqual(index.group_tier_on("2026-02-01", 16), "Grupo 16")
+		self.assertEqual(index.group_tier_on("2026-02-01", 49), "Grupo 16")
+		self.assertEqual(index.group_tier_on("2026-02-01", 50), "Grupo 50")
+		self.assertEqual(index.group_tier_on("2026-02-01", 500), "Grupo 200")
+
+	def test_tier_not_valid_falls_back_to_lower_tier(self):
+		self.assertEqual(self.make_index().group_tier_on("2025-12-01", 500), "Grupo 50")
+
+	def test_tier_names(self):
+		self.assertEqual(self.make_index().group_tier_names(), {"Grupo 16", "Grupo 50", "Grupo 200"})
@@ -0,0 +1,47 @@
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from acuamania.acuamania.promo_engine.audiences import (
+	clear_party_categories,
+	get_document_categories,
+	get_party_categories,
+	update_party_categories,
+)
+
+
+def make_party(doctype, name, *categories):
+	return frappe._dict(
+		doctype=doctype,
+		name=name,
+		custom_customer_category=[frappe._dict(customer_category=category) for category in categories],
+	)
+
+
+class TestCustomerCategoryMembership(FrappeTestCase):
+	def tearDown(self):
+		clear_party_categories("Customer", "_Test Audiencia Cliente")
+		clear_party_categories("Contact", "_Test Audiencia Contacto")
+
+	def test_party_update_refreshes_the_index(self):
+		update_party_categories(make_party("Customer", "_Test Audiencia Cliente", "Socio"))
+		self.assertEqual(get_party_categories("Customer", "_Test Audiencia Cliente"), {"Socio"})
+
+		update_party_categories(make_party("Customer", "_Test Audiencia Cliente", "Recurrente"))
+		self.assertEqual(get_party_categories("Customer", "_Test Audiencia Cliente"), {"Recurrente"})
+
+	def test_document_collects_customer_and_contact_categories(self):
+		update_party_categories(make_party("Customer", "_Test Audiencia Cliente", "Socio"))
+		update_party_categories(make_party("Contact", "_Test Audiencia Contacto", "Recurrente"))
+
+		order = frappe._dict(
+			doctype="Sales Order",
+			customer="_Test Audiencia Cliente",
+			contact_person="_Test Audiencia Contacto",
+			custom_customer_category=[frappe._dict(customer_category="Nuevo")],
+		)
+
+		self.assertEqual(get_document_categories(order), {"Socio", "Recurrente", "Nuevo"})
+
+	def test_unknown_party_has_no_categories(self):
+		self.assertEqual(get_party_categories("Customer", "_Test Audiencia Inexistente"), frozenset())
+		self.assertEqual(get_party_categories("Supplier", "_Test Audiencia Cliente"), frozenset())
@@ -0,0 +1,104 @@
+import random
+import unittest
+
+import numpy as np
+
+from acuamania.acuamania.promo_engine.backtest import ColumnEncoder, compare_with_engine, evaluate_chunk
+from acuamania.acuamania.promo_engine.core import group_lines_by_code, price_promotion
+from acuamania.acuamania.promo_engine.models import Line, Promotion
+
+RANDOM_ORDERS = 300
+ITEM_GROUPS = {f"ITEM-{index}": ("Entrada", "Bebidas", "Comidas")[index % 3] for index in range(1, 7)}
+
+
+def make_encoder():
+	encoder = ColumnEncoder()
+	encoder.item_groups.update(ITEM_GROUPS)
+	return encoder
+
+
+def make_orders(rng):
+	orders = []
+	for _ in range(RANDOM_ORDERS):
+		lines = [
+			Line(
+				f"ITEM-{rng.randint(1, 6)}",
+				rng.choice([0, 1, 2, 3, 5, 17, 120, rng.randint(0, 2000)]),
+				rng.choice([0, 610, 910, 1000, round(rng.uniform(1, 2500), 2)]),
+			)
+			for _ in range(rng.randint(0, 8))
+		]
+		for line in lines:
+			line.item_group = ITEM_GROUPS[line.item_code]
+		orders.append(lines)
+	return orders
+
+
+def make_chunk(orders, encoder):
+	rows = [(index, line) for index, lines in enumerate(orders) for line in lines]
+	item_codes = [line.item_code for _, line in rows]
+	code_ids, group_ids = encoder.encode_codes(item_codes)
+
+	return {
+		"parents": [f"SO-{index:05d}" for index in range(len(orders))],
+		"parent": np.array([index for index, _ in rows], dtype=np.int64),
+		"code": code_ids,
+		"group": group_ids,
+		"qty": np.array([float(line.qty) for _, line in rows]),
+		"rate": np.array([float(line.rate) for _, line in rows]),
+		"item_codes": item_codes,
+	}
+
+
+def make_promotions(rng):
+	promotions = []
+	for index in range(40):
+		apply_type = ("requeridos x gratuitos", "precio fijo", "porcentaje", "precio de descuento")[index % 4]
+		promotions.append(
+			Promotion(
+				name=f"P{index}",
+				promotion_name=f"P{index}",
+				active=1,
+				apply_type=apply_type,
+				required=rng.randint(1, 5),
+				free=rng.randint(1, 2),
+				fixed_price=rng.choice((250, 610, 900)),
+				discount_percentage=rng.choice((5, 10, 25)),
+				discount_amount=rng.choice((100, 500)),
+				products=frozenset(rng.sample(sorted(ITEM_GROUPS), rng.randint(0, 2))),
+				categories=frozenset(
+					rng.sample(["Entrada", "Bebidas", "Comidas", "Otros"], rng.randint(0, 2))
+				),
+				min_qty_required=rng.choice((0, 0, 5, 40)),
+			)
+		)
+	return promotions
+
+
+class TestVectorizedBacktest(unittest.TestCase):
+	def test_matches_per_document_engine(self):
+		rng = random.Random(20251201)
+		orders = make_orders(rng)
+		encoder = make_encoder()
+		chunk = make_chunk(orders, encoder)
+
+		for promo in make_promotions(rng):
+			discount, qty = evaluate_chunk(promo, chunk, encoder)
+
+			for index, lines in enumerate(orders):
+				expected = price_promotion(promo, group_lines_by_code(lines))
+				self.assertAlmostEqual(
+					discount[index], expected.discount or 0, places=4, msg=promo.apply_type
+				)
+				self.assertAlmostEqual(qty[index], expected.qty or 0, places=4, msg=promo.apply_type)
+
+	def test_compare_with_engine_reports_mismatches(self):
+		promo = Promotion(
+			name="10%", promotion_name="10%", active=1, apply_type="porcentaje", discount_percentage=10
+		)
+		lines = [Line("ITEM-1", 2, 1000, "Entrada")]
+
+		report = compare_with_engine(promo, [("SO-1", lines, 200.0), ("SO-2", lines, 150.0)])
+
+		self.assertEqual(report["checked"], 2)
+		self.assertEqual([row["sales_order"] for row in report["mismatches"]], ["SO-2"])
@@ -0,0 +1,353 @@
+import pickle
+import unittest
+
+from acuamania.acuamania.promo_engine.core import PRICING_MODE_EXCLUSIVE, price_cart
+from acuamania.acuamania.promo_engine.models import Cart, Line, Promotion
+
+
+def make_promotion(name, apply_type, **values):
+	values.setdefault("active", 1)
+	values.setdefault("products", frozenset())
+	values.setdefault("categories", frozenset())
+	return Promotion(name=name, promotion_name=name, apply_type=apply_type, **values)
+
+
+def make_cart():
+	return Cart(
+		[
+			Line("ENTR-GRAL", 2, 910, "Entrada"),
+			Line("ENTR-NIÑO", 2, 610, "Entrada"),
+			Line("GASEOSA", 3, 100, "Bebidas"),
+		]
+	)
+
+
+class TestPriceCart(unittest.TestCase):
+	def test_required_x_free_on_all_items(self):
+		result = price_cart(
+			make_cart(), [make_promotion("4x1", "requeridos x gratuitos", required=4, free=1)]
+		)
+
+		self.assertEqual(result.total_discount, 100)
+		self.assertEqual(result.promotions[0].qty, 1)
+		self.assertEqual(result.promotions[0].applied_name, "4x1")
+
+	def test_category_scope(self):
+		promo = make_promotion(
+			"10% Entradas", "porcentaje", discount_percentage=10, categories=frozenset({"Entrada"})
+		)
+
+		result = price_cart(make_cart(), [promo])
+
+		self.assertAlmostEqual(result.total_discount, (2 * 910 + 2 * 610) * 0.1)
+		self.assertEqual(result.promotions[0].qty, 4)
+
+	def test_product_scope_fixed_price(self):
+		promo = make_promotion(
+			"Residentes", "precio fijo", fixed_price=610, products=frozenset({"ENTR-GRAL", "ENTR-NIÑO"})
+		)
+
+		result = price_cart(make_cart(), [promo])
+
+		self.assertEqual(result.total_discount, (910 - 610) * 2)
+		self.assertEqual(result.promotions[0].qty, 2)
+
+	def test_missing_and_inactive_promotions(self):
+		inactive = make_promotion("Apagada", "porcentaje", discount_percentage=50, active=0)
+
+		result = price_cart(make_cart(), [None, inactive])
+
+		self.assertEqual(result.total_discount, 0)
+		self.assertEqual([r.applied_name for r in result.promotions], ["", ""])
+		self.assertIsNone(result.promotions[1].qty)
+
+	def test_promotion_without_applicable_items(self):
+		promo = make_promotion(
+			"Solo Combo", "porcentaje", discount_percentage=10, products=frozenset({"COMBO"})
+		)
+
+		result = price_cart(make_cart(), [promo])
+
+		self.assertEqual(result.promotions[0].applied_name, "Solo Combo")
+		self.assertEqual(result.promotions[0].discount, 0)
+		self.assertIsNone(result.promotions[0].qty)
+
+	def test_combo_gives_cheapest_unit_per_combo(self):
+		promo = make_promotion(
+			"Entrada + Gaseosa", "combo", free=1, bundle=(("ENTR-GRAL", 1), ("GASEOSA", 1))
+		)
+
+		result = price_cart(make_cart(), [promo])
+
+		self.assertEqual(result.total_discount, 200)
+		self.assertEqual(result.promotions[0].qty, 2)
+
+	def test_discounts_are_summed(self):
+		result = price_cart(
+			make_cart(),
+			[
+				make_promotion("Fijo 500", "precio de descuento", discount_amount=500),
+				make_promotion("4x1", "requeridos x gratuitos", required=4, free=1),
+			],
+		)
+
+		self.assertEqual(result.total_discount, 600)
+
+
+class TestExclusivePricing(unittest.TestCase):
+	def test_units_are_not_discounted_twice(self):
+		promotions = [
+			make_promotion("10%", "porcentaje", discount_percentage=10),
+			make_promotion(
+				"50% Entradas", "porcentaje", discount_percentage=50, categories=frozenset({"Entrada"})
+			),
+		]
+
+		result = price_cart(make_cart(), promotions, mode=PRICING_MODE_EXCLUSIVE)
+
+		# Entradas go to the 50% promotion, drinks to the 10% one
+		self.assertAlmostEqual(result.promotions[1].discount, (2 * 910 + 2 * 610) * 0.5)
+		self.assertAlmostEqual(result.promotions[0].discount, 3 * 100 * 0.1)
+		self.assertAlmostEqual(result.total_discount, 1520 + 30)
+		self.assertFalse(result.budget_exceeded)
+
+	def test_search_beats_the_greedy_on_shared_units(self):
+		promotions = [
+			make_promotion(
+				"Fijo 80", "precio de descuento", discount_amount=80, categories=frozenset({"Bebidas"})
+			),
+			make_promotion(
+				"3x1 Bebidas", "requeridos x gratuitos", required=3, free=1, categories=frozenset({"Bebidas"})
+			),
+			make_promotion(
+				"Fijo 50", "precio de descuento", discount_amount=50, categories=frozenset({"Bebidas"})
+			),
+		]
+
+		stacked = price_cart(make_cart(), promotions)
+		exclusive = price_cart(make_cart(), promotions, mode=PRICING_MODE_EXCLUSIVE)
+
+		self.assertEqual(stacked.total_discount, 230)
+		# the greedy gives the three drinks to the 3x1 (100); the two flat
+		# discounts on one drink each are worth more together
+		self.assertEqual(exclusive.total_discount, 130)
+		self.assertEqual(exclusive.promotions[0].discount, 80)
+		self.assertEqual(exclusive.promotions[2].discount, 50)
+		self.assertEqual(exclusive.promotions[1].discount, 0)
+		self.assertEqual(exclusive.promotions[1].applied_name, "3x1 Bebidas")
+
+	def test_discount_cap(self):
+		promotions = [
+			make_promotion("Fijo 500", "precio de descuento", discount_amount=500),
+			make_promotion("4x1", "requeridos x gratuitos", required=4, free=1),
+		]
+
+		result = price_cart(make_cart(), promotions, max_discount_percentage=10)
+
+		# cart amount is 3340: the cap trims the last promotion first
+		self.assertAlmostEqual(result.total_discount, 334)
+		self.assertAlmostEqual(result.promotions[0].discount, 334)
+		self.assertEqual(result.promotions[1].discount, 0)
+
+	def test_combo_units_are_consumed(self):
+		promotions = [
+			make_promotion("Combo", "combo", free=1, bundle=(("ENTR-GRAL", 1), ("GASEOSA", 1))),
+			make_promotion(
+				"3x1 Bebidas", "requeridos x gratuitos", required=3, free=1, categories=frozenset({"Bebidas"})
+			),
+		]
+
+		result = price_cart(make_cart(), promotions, mode=PRICING_MODE_EXCLUSIVE)
+
+		# the combo takes two drinks, the single drink left cannot complete a 3x1
+		self.assertEqual(result.promotions[0].discount, 200)
+		self.assertEqual(result.promotions[1].discount, 0)
+
+	def test_time_budget_covers_the_initial_pricing(self):
+		promotions = [make_promotion(f"{pct}%", "porcentaje", discount_percentage=pct) for pct in (5, 30, 10)]
+
+		result = price_cart(make_cart(), promotions, mode=PRICING_MODE_EXCLUSIVE, time_budget_ms=1e-9)
+
+		# the budget is spent after pricing the first promotion: the rest are skipped
+		self.assertTrue(result.budget_exceeded)
+		self.assertAlmostEqual(result.total_discount, 3340 * 0.05)
+		self.assertEqual([r.discount for r in result.promotions][1:], [0, 0])
+		self.assertEqual(result.promotions[1].applied_name, "30%")
+
+	def test_search_bound_allows_free_units_to_grow(self):
+		cart = Cart([Line("I0", 4, 1000, "A"), Line("I0", 6, 1000, "A"), Line("I1", 6, 1, "A")])
+		promotions = [
+			make_promotion("2x1", "requeridos x gratuitos", required=2, free=1),
+			make_promotion(
+				"Fijo 10", "precio de descuento", discount_amount=10, products=frozenset({"I0", "I1"})
+			),
+			make_promotion("Fijo 300", "precio de descuento", discount_amount=300),
+		]
+
+		result = price_cart(cart, promotions, mode=PRICING_MODE_EXCLUSIVE, time_budget_ms=0)
+
+		# both flat discounts take a cheap unit, which leaves the 2x1 three
+		# expensive free units instead of two
+		self.assertAlmostEqual(result.total_discount, 3314)
+		self.assertEqual([r.discount for r in result.promotions], [3004, 10, 300])
+
+
+class TestPromotionPickle(unittest.TestCase):
+	def test_round_trip(self):
+		promo = make_promotion("10%", "porcentaje", discount_percentage=10)
+
+		loaded = pickle.loads(pickle.dumps(promo))
+
+		self.assertEqual(loaded.name, "10%")
+		self.assertEqual(loaded.pricing_values(), promo.pricing_values())
+
+	def test_loads_promotions_pickled_with_other_slots(self):
+		loaded = Promotion.__new__(Promotion)
+		loaded.__setstate__({"name": "Viejo", "apply_type": "porcentaje", "removed_field": 1})
+
+		self.assertEqual(loaded.apply_type, "porcentaje")
+		self.assertIsNone(loaded.discount_percentage)
+		self.assertFalse(hasattr(loaded, "removed_field"))
+
+
+class TestMinQtyRequired(unittest.TestCase):
+	def test_below_minimum_gives_no_discount(self):
+		promo = make_promotion(
+			"10% Entradas",
+			"porcentaje",
+			discount_percentage=10,
+			categories=frozenset({"Entrada"}),
+			min_qty_required=5,
+		)
+
+		result = price_cart(make_cart(), [promo])
+
+		# only 4 Entradas in scope, the 3 drinks do not count
+		self.assertEqual(result.total_discount, 0)
+		self.assertEqual(result.promotions[0].qty, 0)
+		self.assertEqual(result.promotions[0].applied_name, "10% Entradas")
+
+	def test_minimum_for_every_apply_type(self):
+		def promotions(min_qty):
+			return [
+				make_promotion("4x1", "requeridos x gratuitos", required=4, free=1, min_qty_required=min_qty),
+				make_promotion("Fijo", "precio fijo", fixed_price=610, min_qty_required=min_qty),
+				make_promotion("10%", "porcentaje", discount_percentage=10, min_qty_required=min_qty),
+				make_promotion("500", "precio de descuento", discount_amount=500, min_qty_required=min_qty),
+			]
+
+		# the cart has 7 units
+		reached = price_cart(make_cart(), promotions(7))
+		missed = price_cart(make_cart(), promotions(8))
+
+		self.assertTrue(all(result.discount > 0 for result in reached.promotions))
+		self.assertEqual([result.discount for result in missed.promotions], [0, 0, 0, 0])
+
+	def test_exclusive_mode_checks_minimum_on_the_full_cart(self):
+		promotions = [
+			make_promotion(
+				"50% Entradas", "porcentaje", discount_percentage=50, categories=frozenset({"Entrada"})
+			),
+			make_promotion("10%", "porcentaje", discount_percentage=10, min_qty_required=7),
+		]
+
+		result = price_cart(make_cart(), promotions, mode=PRICING_MODE_EXCLUSIVE)
+
+		# only the 3 drinks are left for the 10%, but the cart has 7 units
+		self.assertAlmostEqual(result.promotions[1].discount, 30)
+
+
+class TestAudiencePromotions(unittest.TestCase):
+	def test_only_members_get_the_discount(self):
+		promo = make_promotion(
+			"10% Socios", "porcentaje", discount_percentage=10, audience=frozenset({"Socio"})
+		)
+
+		outsider = price_cart(make_cart(), [promo])
+		member = make_cart()
+		member.customer_categories = frozenset({"Recurrente", "Socio"})
+
+		self.assertEqual(outsider.total_discount, 0)
+		self.assertEqual(outsider.promotions[0].applied_name, "10% Socios")
+		self.assertAlmostEqual(price_cart(member, [promo]).total_discount, 334)
+
+	def test_promotion_without_audience_reaches_everyone(self):
+		promo = make_promotion("10%", "porcentaje", discount_percentage=10, audience=frozenset())
+
+		self.assertAlmostEqual(price_cart(make_cart(), [promo]).total_discount, 334)
+
+	def test_exclusive_mode_skips_other_audiences(self):
+		promotions = [
+			make_promotion("50% Socios", "porcentaje", discount_percentage=50, audience=frozenset({"Socio"})),
+			make_promotion("10%", "porcentaje", discount_percentage=10),
+		]
+
+		result = price_cart(make_cart(), promotions, mode=PRICING_MODE_EXCLUSIVE)
+
+		self.assertEqual(result.promotions[0].discount, 0)
+		self.assertAlmostEqual(result.promotions[1].discount, 334)
+
+
+class TestLineDiscountAllocation(unittest.TestCase):
+	def test_discount_goes_to_the_touched_lines(self):
+		promo = make_promotion(
+			"10% Entradas", "porcentaje", discount_percentage=10, categories=frozenset({"Entrada"})
+		)
+
+		result = price_cart(make_cart(), [promo])
+
+		self.assertEqual(result.line_discounts, [182, 122, 0])
+		self.assertEqual(result.promotions[0].allocation, {0: 182, 1: 122})
+
+	def test_required_x_free_and_fixed_price_lines(self):
+		promotions = [
+			make_promotion("4x1", "requeridos x gratuitos", required=4, free=1),
+			make_promotion("Fijo 800", "precio fijo", fixed_price=800, products=frozenset({"ENTR-GRAL"})),
+		]
+
+		result = price_cart(make_cart(), promotions)
+
+		self.assertEqual(sum(result.promotions[0].allocation.values()), 100)
+		self.assertNotIn(0, result.promotions[0].allocation)
+		self.assertEqual(result.promotions[1].allocation, {0: 220})
+
+	def test_cents_add_up_exactly(self):
+		cart = Cart([Line("A", 1, 10, "Entrada"), Line("B", 1, 10, "Entrada"), Line("C", 1, 10, "Entrada")])
+		promo = make_promotion("Descuento", "precio de descuento", discount_amount=10)
+		promo_third = make_promotion("33.333%", "porcentaje", discount_percentage=100 / 3)
+
+		result = price_cart(cart, [promo, promo_third])
+
+		for promotion_result in result.promotions:
+			self.assertEqual(round(sum(promotion_result.allocation.values()), 2), promotion_result.discount)
+		self.assertEqual(round(sum(result.line_discounts), 2), result.total_discount)
+		self.assertEqual(result.promotions[1].discount, 10)
+		self.assertEqual(sorted(result.promotions[1].allocation.values()), [3.33, 3.33, 3.34])
+
+	def test_exclusive_mode_allocates_to_the_units_it_took(self):
+		promotions = [
+			make_promotion(
+				"50% Entradas", "porcentaje", discount_percentage=50, categories=frozenset({"Entrada"})
+			),
+			make_promotion("10%", "porcentaje", discount_percentage=10),
+		]
+
+		result = price_cart(make_cart(), promotions, mode=PRICING_MODE_EXCLUSIVE)
+
+		self.assertEqual(result.promotions[1].allocation, {2: 30})
+		self.assertEqual(result.line_discounts, [910, 610, 30])
+
+	def test_flat_amount_on_zero_rate_lines_is_still_allocated(self):
+		cart = Cart([Line("CORTESIA", 2, 0, "Entrada"), Line("GASEOSA", 1, 100, "Bebidas")])
+		promotions = [
+			make_promotion(
+				"Fijo 50", "precio de descuento", discount_amount=50, products=frozenset({"CORTESIA"})
+			),
+			make_promotion("10%", "porcentaje", discount_percentage=10),
+		]
+
+		result = price_cart(cart, promotions)
+
+		self.assertEqual(result.promotions[0].allocation, {0: 50})
+		self.assertEqual(result.line_discounts, [50, 10])
+		self.assertEqual(sum(result.line_discounts), result.total_discount)
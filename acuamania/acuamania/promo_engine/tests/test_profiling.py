@@ -0,0 +1,44 @@
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from acuamania.acuamania.promo_engine.engine import apply_selected_promotion
+from acuamania.acuamania.promo_engine.profiling import (
+	PROFILING_CONF_KEY,
+	clear_promo_engine_profiles,
+	get_promo_engine_profiles,
+)
+from acuamania.acuamania.promo_engine.tests.test_promo_engine import add_promotion, create_document_with_item
+
+
+class TestPromoEngineProfiling(FrappeTestCase):
+	def setUp(self):
+		clear_promo_engine_profiles()
+
+	def test_disabled_by_default(self):
+		doc = create_document_with_item("Quotation", "ENTR-GRAL", qty=2, rate=1000)
+		add_promotion(doc, "Descuento 10%")
+
+		with patch.dict(frappe.conf, {PROFILING_CONF_KEY: 0}):
+			apply_selected_promotion(doc)
+
+		self.assertEqual(get_promo_engine_profiles(), [])
+
+	def test_records_phases_and_promotion_rows(self):
+		doc = create_document_with_item("Quotation", "ENTR-GRAL", qty=2, rate=1000)
+		add_promotion(doc, "Descuento 10%")
+
+		with patch.dict(frappe.conf, {PROFILING_CONF_KEY: 1}):
+			apply_selected_promotion(doc)
+
+		record = get_promo_engine_profiles(limit=1)[0]
+		phases = [entry["phase"] for entry in record["phases"]]
+
+		self.assertEqual(record["doctype"], "Quotation")
+		self.assertIn("price_cart", phases)
+		self.assertIn("discount_taxes", phases)
+		self.assertEqual(record["promotions"][0]["promotion"], "Descuento 10%")
+		self.assertIn("load_queries", record["promotions"][0])
+		self.assertEqual(record["promotions"][0]["discount"], 200)
+		self.assertGreaterEqual(record["queries"], 0)
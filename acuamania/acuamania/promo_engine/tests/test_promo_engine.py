@@ -1,6 +1,8 @@
+from unittest.mock import patch
+
 import frappe
 from frappe.tests.utils import FrappeTestCase
-from frappe.utils import today
+from frappe.utils import flt, today
 
 
 def create_test_customer():
@@ -55,6 +57,10 @@ class TestPromoEngine(FrappeTestCase):
 			expected,
 			f"{doctype} promo '{promo_name}' failed",
 		)
+		self.assertEqual(
+			flt(sum(flt(row.custom_promotion_discount) for row in doc.items), 2),
+			flt(doc.discount_amount, 2),
+		)
 
 	def test_mixed_items_required_free(self):
 		doc = create_document_with_item("Quotation", "ENTR-GRAL", qty=2, rate=910)
@@ -217,3 +223,73 @@ class TestPromoEngine(FrappeTestCase):
 		doc.save()
 
 		self.assertEqual(doc.discount_amount, 0)
+
+	def test_unchanged_cart_is_not_repriced(self):
+		doc = create_document_with_item("Quotation", "ENTR-GRAL", qty=2, rate=1000)
+		add_promotion(doc, "Descuento 10%")
+		doc.save()
+
+		with patch("acuamania.acuamania.promo_engine.engine.reprice_document") as reprice_document:
+			doc.save()
+
+		reprice_document.assert_not_called()
+		self.assertEqual(doc.discount_amount, 200)
+
+	def test_changed_cart_is_repriced(self):
+		doc = create_document_with_item("Quotation", "ENTR-GRAL", qty=2, rate=1000)
+		add_promotion(doc, "Descuento 10%")
+		doc.save()
+
+		doc.items[0].qty = 3
+		doc.save()
+
+		self.assertEqual(doc.discount_amount, 300)
+
+	def test_manual_discount_is_repriced(self):
+		doc = create_document_with_item("Quotation", "ENTR-GRAL", qty=2, rate=1000)
+		add_promotion(doc, "Descuento 10%")
+		doc.save()
+
+		doc.discount_amount = 999
+		doc.save()
+
+		self.assertEqual(doc.discount_amount, 200)
+
+
+class TestGroupTiers(FrappeTestCase):
+	def setUp(self):
+		for promo_name, group_min_qty in (("Test Tier 30", 30), ("Test Tier 60", 60)):
+			frappe.delete_doc_if_exists("Park Promotion", promo_name, force=True)
+			frappe.get_doc(
+				{
+					"doctype": "Park Promotion",
+					"promotion_name": promo_name,
+					"apply_type": "porcentaje",
+					"discount_percentage": 5,
+					"group_min_qty": group_min_qty,
+					"active": 1,
+					"valid_from": "2000-01-01",
+					"valid_upto": "2099-12-31",
+				}
+			).insert(ignore_permissions=True)
+
+	def get_promotion_rows(self, doc):
+		return {row.promotion: row.auto_applied for row in doc.custom_promotion_table}
+
+	def test_injected_tier_follows_the_cart(self):
+		doc = create_document_with_item("Quotation", "ENTR-GRAL", qty=40, rate=100)
+		doc.save()
+
+		self.assertEqual(self.get_promotion_rows(doc), {"Test Tier 30": 1})
+
+		doc.items[0].qty = 70
+		doc.save()
+
+		self.assertEqual(self.get_promotion_rows(doc), {"Test Tier 60": 1})
+
+	def test_tiers_selected_by_hand_are_kept(self):
+		doc = create_document_with_item("Quotation", "ENTR-GRAL", qty=40, rate=100)
+		add_promotion(doc, "Test Tier 60")
+		doc.save()
+
+		self.assertEqual(self.get_promotion_rows(doc), {"Test Tier 60": 0, "Test Tier 30": 1})
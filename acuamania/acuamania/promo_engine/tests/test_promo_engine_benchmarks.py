@@ -0,0 +1,53 @@
+import os
+import tempfile
+
+from frappe.tests.utils import FrappeTestCase
+
+from acuamania.acuamania.promo_engine.benchmarks import (
+	PROFILES,
+	collect_benchmarks,
+	find_regressions,
+	run_benchmarks,
+)
+
+
+class TestPromoEngineBenchmarks(FrappeTestCase):
+	def test_first_run_writes_the_baseline(self):
+		"""
+		Only the report structure is checked; the timing thresholds are enforced
+		by `bench promo-engine-benchmark`, outside the unit suite.
+		"""
+		with tempfile.TemporaryDirectory() as directory:
+			baseline_path = os.path.join(directory, "baseline.json")
+			report = run_benchmarks("smoke", baseline_path=baseline_path)
+
+			self.assertEqual(report["baseline_written"], baseline_path)
+			self.assertTrue(os.path.exists(baseline_path))
+
+		self.assertEqual(report["profile"], "smoke")
+		self.assertEqual(len(report["results"]), len(PROFILES["smoke"]))
+		for metrics in report["results"].values():
+			self.assertIn("price_cart_ms", metrics)
+
+	def test_collect_reports_rules_and_queries(self):
+		results = collect_benchmarks("smoke", repeat=1)
+
+		for metrics in results.values():
+			self.assertIn("price_cart_ms", metrics)
+			self.assertIn("rule[porcentaje]_ms", metrics)
+			self.assertIn("apply_selected_promotion_queries", metrics)
+
+	def test_find_regressions(self):
+		baseline = {"s": {"price_cart_ms": 1.0, "apply_selected_promotion_queries": 3}}
+
+		self.assertEqual(
+			find_regressions(
+				baseline, {"s": {"price_cart_ms": 1.2, "apply_selected_promotion_queries": 3}}, 0.3
+			),
+			[],
+		)
+
+		regressions = find_regressions(
+			baseline, {"s": {"price_cart_ms": 1.5, "apply_selected_promotion_queries": 4}}, 0.3
+		)
+		self.assertEqual(len(regressions), 2)
@@ -0,0 +1,61 @@
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from acuamania.acuamania.promo_engine.promotion_cache import (
+	clear_promotion_cache,
+	get_compiled_promotion,
+)
+
+TEST_PROMO_NAME = "Test Cache Promo 10%"
+
+
+class TestPromotionCache(FrappeTestCase):
+	def setUp(self):
+		frappe.delete_doc_if_exists("Park Promotion", TEST_PROMO_NAME, force=True)
+		self.promo = frappe.get_doc(
+			{
+				"doctype": "Park Promotion",
+				"promotion_name": TEST_PROMO_NAME,
+				"apply_type": "porcentaje",
+				"discount_percentage": 10,
+				"active": 1,
+				"valid_from": "2000-01-01",
+				"valid_upto": "2099-12-31",
+			}
+		).insert(ignore_permissions=True)
+
+	def tearDown(self):
+		frappe.delete_doc_if_exists("Park Promotion", TEST_PROMO_NAME, force=True)
+		clear_promotion_cache(TEST_PROMO_NAME)
+
+	def test_compiled_promotion_is_read_only(self):
+		promo = get_compiled_promotion(TEST_PROMO_NAME)
+
+		self.assertEqual(promo.apply_type, "porcentaje")
+		self.assertEqual(promo.discount_percentage, 10)
+		self.assertEqual(promo.products, frozenset())
+
+		with self.assertRaises(AttributeError):
+			promo.discount_percentage = 50
+
+	def test_repeated_loads_do_not_query(self):
+		get_compiled_promotion(TEST_PROMO_NAME)
+
+		with self.assertQueryCount(0):
+			for _ in range(10):
+				get_compiled_promotion(TEST_PROMO_NAME)
+
+	def test_update_invalidates_cache(self):
+		self.assertEqual(get_compiled_promotion(TEST_PROMO_NAME).discount_percentage, 10)
+
+		self.promo.discount_percentage = 25
+		self.promo.save(ignore_permissions=True)
+
+		self.assertEqual(get_compiled_promotion(TEST_PROMO_NAME).discount_percentage, 25)
+
+	def test_trash_invalidates_cache(self):
+		get_compiled_promotion(TEST_PROMO_NAME)
+
+		frappe.delete_doc("Park Promotion", TEST_PROMO_NAME, force=True)
+
+		self.assertIsNone(get_compiled_promotion(TEST_PROMO_NAME))
@@ -0,0 +1,100 @@
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from acuamania.acuamania.promo_engine.promotion_cache import get_compiled_promotion
+from acuamania.acuamania.promo_engine.redemptions import (
+	_redemption_key,
+	get_redeemed_units,
+	get_redemption_count,
+	is_promotion_exhausted,
+	reconcile_redemption_counts,
+	release_redemptions,
+	reserve_redemptions,
+)
+
+PROMO_NAME = "Test Cupo 5 Entradas"
+
+
+def make_order(*rows):
+	return frappe._dict(
+		custom_promotion_table=[
+			frappe._dict(promotion=promo, discount=discount, qty=qty) for promo, discount, qty in rows
+		]
+	)
+
+
+class TestPromotionRedemptions(FrappeTestCase):
+	def setUp(self):
+		if not frappe.db.exists("Park Promotion", PROMO_NAME):
+			frappe.get_doc(
+				{
+					"doctype": "Park Promotion",
+					"promotion_name": PROMO_NAME,
+					"apply_type": "porcentaje",
+					"discount_percentage": 10,
+					"active": 1,
+					"redemption_cap": 5,
+				}
+			).insert(ignore_permissions=True)
+
+		frappe.cache().set(_redemption_key(PROMO_NAME), 0)
+
+	def tearDown(self):
+		frappe.cache().delete(_redemption_key(PROMO_NAME))
+
+	def test_only_discounted_rows_are_redeemed(self):
+		order = make_order((PROMO_NAME, 100, 2), ("Otra", 0, 3), (PROMO_NAME, 50, 1))
+
+		self.assertEqual(get_redeemed_units(order), {PROMO_NAME: 3})
+
+	def test_submit_and_cancel_move_the_counter(self):
+		order = make_order((PROMO_NAME, 100, 3))
+
+		reserve_redemptions(order)
+		self.assertEqual(get_redemption_count(PROMO_NAME), 3)
+
+		release_redemptions(order)
+		self.assertEqual(get_redemption_count(PROMO_NAME), 0)
+
+	def test_cap_is_enforced_atomically(self):
+		reserve_redemptions(make_order((PROMO_NAME, 100, 4)))
+
+		with self.assertRaises(frappe.ValidationError):
+			reserve_redemptions(make_order((PROMO_NAME, 100, 2)))
+
+		# the refused order does not keep its units
+		self.assertEqual(get_redemption_count(PROMO_NAME), 4)
+		self.assertFalse(is_promotion_exhausted(get_compiled_promotion(PROMO_NAME)))
+
+		reserve_redemptions(make_order((PROMO_NAME, 100, 1)))
+		self.assertTrue(is_promotion_exhausted(get_compiled_promotion(PROMO_NAME)))
+
+	def test_cancel_never_takes_the_counter_below_zero(self):
+		frappe.cache().set(_redemption_key(PROMO_NAME), 1)
+
+		release_redemptions(make_order((PROMO_NAME, 100, 3)))
+
+		self.assertEqual(get_redemption_count(PROMO_NAME), 0)
+
+	def test_cancel_seeds_a_lost_counter(self):
+		frappe.cache().delete(_redemption_key(PROMO_NAME))
+
+		release_redemptions(make_order((PROMO_NAME, 100, 3)))
+
+		self.assertEqual(frappe.cache().get(_redemption_key(PROMO_NAME)), b"0")
+
+	def test_uncapped_promotions_have_no_counter(self):
+		order = make_order(("Promocion Sin Cupo", 100, 3))
+
+		reserve_redemptions(order)
+		release_redemptions(order)
+
+		self.assertIsNone(frappe.cache().get(_redemption_key("Promocion Sin Cupo")))
+
+	def test_reconcile_corrects_the_counter(self):
+		frappe.cache().set(_redemption_key(PROMO_NAME), 4)
+
+		reconcile_redemption_counts()
+
+		# no submitted Sales Order redeemed the test promotion
+		self.assertEqual(get_redemption_count(PROMO_NAME), 0)
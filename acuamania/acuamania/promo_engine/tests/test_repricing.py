@@ -0,0 +1,124 @@
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from acuamania.acuamania.promo_engine.engine import reprice_document
+from acuamania.acuamania.promo_engine.repricing import (
+	get_draft_documents_for_promotion,
+	reprice_drafts_for_promotion,
+)
+from acuamania.acuamania.promo_engine.tests.test_promo_engine import (
+	add_promotion,
+	create_document_with_item,
+)
+
+TEST_PROMO_NAME = "Test Reprice Promo"
+SECOND_PROMO_NAME = "Test Reprice Promo 2"
+
+
+def insert_promotion(promo_name, discount_percentage):
+	frappe.delete_doc_if_exists("Park Promotion", promo_name, force=True)
+	return frappe.get_doc(
+		{
+			"doctype": "Park Promotion",
+			"promotion_name": promo_name,
+			"apply_type": "porcentaje",
+			"discount_percentage": discount_percentage,
+			"active": 1,
+			"valid_from": "2000-01-01",
+			"valid_upto": "2099-12-31",
+		}
+	).insert(ignore_permissions=True)
+
+
+def reprice_without_commit(promo_name):
+	# the job commits after each chunk; keep the test inside its transaction
+	with patch.object(frappe.db, "commit"):
+		return reprice_drafts_for_promotion(promo_name)
+
+
+class TestDraftRepricing(FrappeTestCase):
+	def setUp(self):
+		self.promo = insert_promotion(TEST_PROMO_NAME, 10)
+
+		self.quotation = create_document_with_item("Quotation", "ENTR-GRAL", qty=2, rate=1000)
+		add_promotion(self.quotation, TEST_PROMO_NAME)
+		self.quotation.save()
+
+	def test_finds_drafts_referencing_the_promotion(self):
+		drafts = get_draft_documents_for_promotion(TEST_PROMO_NAME)
+
+		self.assertIn(("Quotation", self.quotation.name), drafts)
+
+	def test_reprices_drafts_after_promotion_change(self):
+		self.assertEqual(self.quotation.discount_amount, 200)
+
+		self.promo.discount_percentage = 20
+		self.promo.save(ignore_permissions=True)
+
+		summary = reprice_without_commit(TEST_PROMO_NAME)
+
+		self.assertEqual(summary["failed"], 0)
+		self.assertGreaterEqual(summary["updated"], 1)
+		self.assertEqual(frappe.db.get_value("Quotation", self.quotation.name, "discount_amount"), 400)
+		self.assertEqual(
+			frappe.db.get_value(
+				"Park Promotion Selection",
+				{"parent": self.quotation.name, "promotion": TEST_PROMO_NAME},
+				"discount",
+			),
+			400,
+		)
+
+	def test_unchanged_drafts_are_not_written(self):
+		summary = reprice_without_commit(TEST_PROMO_NAME)
+
+		self.assertEqual(summary["updated"], 0)
+
+	def test_rows_removed_while_repricing_are_deleted(self):
+		insert_promotion(SECOND_PROMO_NAME, 5)
+		add_promotion(self.quotation, SECOND_PROMO_NAME)
+		self.quotation.save()
+		removed = self.quotation.custom_promotion_table[0].name
+
+		def remove_first_row_and_reprice(doc):
+			doc.remove(doc.custom_promotion_table[0])
+			reprice_document(doc)
+
+		with patch(
+			"acuamania.acuamania.promo_engine.repricing.reprice_document", remove_first_row_and_reprice
+		):
+			summary = reprice_without_commit(TEST_PROMO_NAME)
+
+		self.assertEqual(summary["updated"], 1)
+		self.assertFalse(frappe.db.exists("Park Promotion Selection", removed))
+		self.assertEqual(
+			frappe.get_all(
+				"Park Promotion Selection",
+				filters={"parent": self.quotation.name, "parentfield": "custom_promotion_table"},
+				fields=["promotion", "idx"],
+			),
+			[{"promotion": SECOND_PROMO_NAME, "idx": 1}],
+		)
+
+	def test_combo_edits_reprice_only_when_pricing_changes(self):
+		combo = frappe.get_doc(
+			{
+				"doctype": "Combo Promotion",
+				"required": 1,
+				"free": 1,
+				"combos_promotion_items": [{"product": "ENTR-GRAL"}],
+			}
+		).insert(ignore_permissions=True)
+		frappe.db.set_value("Park Promotion", TEST_PROMO_NAME, "combo_promotion", combo.name)
+
+		with patch(
+			"acuamania.acuamania.doctype.combo_promotion.combo_promotion.enqueue_draft_repricing"
+		) as enqueue:
+			combo.save(ignore_permissions=True)
+			enqueue.assert_not_called()
+
+			combo.free = 2
+			combo.save(ignore_permissions=True)
+			enqueue.assert_called_once_with(TEST_PROMO_NAME)
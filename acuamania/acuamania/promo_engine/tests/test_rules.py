@@ -0,0 +1,182 @@
+import random
+import unittest
+from types import SimpleNamespace
+
+from acuamania.acuamania.promo_engine.models import Line
+from acuamania.acuamania.promo_engine.rules import apply_combo, apply_required_x_free
+
+RANDOM_CARTS = 500
+
+
+def make_promo(required, free):
+	return SimpleNamespace(required=required, free=free, products=frozenset())
+
+
+def make_cart(rng):
+	items_by_code = {}
+	for _ in range(rng.randint(1, 8)):
+		code = f"ITEM-{rng.randint(1, 4)}"
+		row = SimpleNamespace(
+			item_code=code,
+			qty=rng.choice([0, 1, 2, 3, 5, 17, 120, rng.randint(0, 2000)]),
+			rate=rng.choice([0, 610, 910, 1000, round(rng.uniform(1, 2500), 2)]),
+		)
+		items_by_code.setdefault(code, []).append(row)
+	return items_by_code
+
+
+def expanded_required_x_free(promo, items_by_code):
+	"""Reference: the original unit-expansion algorithm."""
+	required_qty, free_qty = int(promo.required or 0), int(promo.free or 0)
+	if required_qty <= 0 or free_qty <= 0:
+		return 0, 0
+
+	unit_prices = []
+	for rows in items_by_code.values():
+		for row in rows:
+			qty = int(row.qty or 0)
+			rate = float(row.rate or 0)
+			if qty <= 0 or rate <= 0:
+				continue
+			unit_prices.extend([rate] * qty)
+
+	total_units = len(unit_prices)
+	if total_units < required_qty:
+		return 0, 0
+
+	free_units = (total_units // required_qty) * free_qty
+	if free_units <= 0:
+		return 0, 0
+
+	unit_prices.sort()
+	return sum(unit_prices[:free_units]), free_units
+
+
+class TestRequiredXFreeRuns(unittest.TestCase):
+	def test_matches_expansion_on_random_carts(self):
+		rng = random.Random(20250101)
+
+		for _ in range(RANDOM_CARTS):
+			promo = make_promo(rng.randint(0, 6), rng.randint(0, 3))
+			items_by_code = make_cart(rng)
+
+			expected_discount, expected_qty = expanded_required_x_free(promo, items_by_code)
+			discount, qty = apply_required_x_free(promo, items_by_code)
+
+			self.assertEqual(qty, expected_qty)
+			self.assertAlmostEqual(discount, expected_discount, places=6)
+
+	def test_mixed_rates_takes_cheapest_units(self):
+		items_by_code = {
+			"ENTR-GRAL": [SimpleNamespace(qty=2, rate=910)],
+			"ENTR-NIÑO": [SimpleNamespace(qty=2, rate=610)],
+		}
+
+		self.assertEqual(apply_required_x_free(make_promo(4, 1), items_by_code), (610, 1))
+
+	def test_large_group_is_exact_for_whole_rates(self):
+		items_by_code = {
+			"ENTR-GRAL": [SimpleNamespace(qty=1500, rate=910)],
+			"ENTR-NIÑO": [SimpleNamespace(qty=500, rate=610)],
+		}
+
+		discount, qty = apply_required_x_free(make_promo(2, 1), items_by_code)
+
+		self.assertEqual(qty, 1000)
+		self.assertEqual(discount, 500 * 610 + 500 * 910)
+
+	def test_touched_units_are_the_cheapest_complete_groups(self):
+		adult = Line("ENTR-GRAL", 3, 910)
+		child = Line("ENTR-NIÑO", 2, 610)
+		touched = {}
+
+		discount, qty = apply_required_x_free(
+			make_promo(2, 1), {"ENTR-GRAL": [adult], "ENTR-NIÑO": [child]}, touched
+		)
+
+		self.assertEqual((discount, qty), (2 * 610, 2))
+		self.assertEqual(touched, {child: 2, adult: 2})
+
+
+def make_combo(bundle, free, required=0):
+	return SimpleNamespace(bundle=tuple(sorted(bundle.items())), required=required, free=free)
+
+
+def expanded_combo(promo, items_by_code):
+	"""Reference: builds bundles unit by unit from per-code price lists."""
+	bundle = dict(promo.bundle)
+	free_per_bundle = min(int(promo.free or 0), sum(bundle.values()))
+	if not bundle or free_per_bundle <= 0:
+		return 0, 0
+
+	units = {}
+	for code in bundle:
+		for row in items_by_code.get(code, []):
+			if int(row.qty or 0) > 0 and float(row.rate or 0) > 0:
+				units.setdefault(code, []).extend([float(row.rate)] * int(row.qty))
+		units.setdefault(code, []).sort()
+
+	bundled = []
+	bundles = 0
+	while all(len(units[code]) >= needed for code, needed in bundle.items()):
+		for code, needed in bundle.items():
+			bundled.extend(units[code][:needed])
+			units[code] = units[code][needed:]
+		bundles += 1
+
+	if not bundles or bundles < int(promo.required or 0):
+		return 0, 0
+
+	bundled.sort()
+	return sum(bundled[: bundles * free_per_bundle]), bundles * free_per_bundle
+
+
+class TestCombo(unittest.TestCase):
+	def test_matches_expansion_on_random_carts(self):
+		rng = random.Random(20251128)
+
+		for _ in range(RANDOM_CARTS):
+			bundle = {
+				f"ITEM-{code}": rng.randint(1, 3) for code in rng.sample(range(1, 5), rng.randint(1, 3))
+			}
+			promo = make_combo(bundle, rng.randint(0, 4), rng.randint(0, 3))
+			items_by_code = make_cart(rng)
+
+			expected_discount, expected_qty = expanded_combo(promo, items_by_code)
+			discount, qty = apply_combo(promo, items_by_code)
+
+			self.assertEqual(qty, expected_qty)
+			self.assertAlmostEqual(discount, expected_discount, places=6)
+
+	def test_incomplete_combo_gives_nothing(self):
+		items_by_code = {"ENTR-GRAL": [SimpleNamespace(qty=3, rate=910)]}
+
+		self.assertEqual(apply_combo(make_combo({"ENTR-GRAL": 1, "GASEOSA": 1}, 1), items_by_code), (0, 0))
+
+	def test_large_group_counts_complete_combos(self):
+		items_by_code = {
+			"ENTR-GRAL": [SimpleNamespace(qty=1000, rate=910)],
+			"GASEOSA": [SimpleNamespace(qty=300, rate=100), SimpleNamespace(qty=200, rate=120)],
+		}
+
+		# 2 entradas + 1 gaseosa, the drink is free: 500 combos
+		discount, qty = apply_combo(make_combo({"ENTR-GRAL": 2, "GASEOSA": 1}, 1), items_by_code)
+
+		self.assertEqual(qty, 500)
+		self.assertEqual(discount, 300 * 100 + 200 * 120)
+
+	def test_minimum_combos_required(self):
+		items_by_code = {
+			"ENTR-GRAL": [SimpleNamespace(qty=2, rate=910)],
+			"GASEOSA": [SimpleNamespace(qty=2, rate=100)],
+		}
+		promo = make_combo({"ENTR-GRAL": 1, "GASEOSA": 1}, 1, required=3)
+
+		# 'required' counts complete combos, not units: 4 units are only 2 combos
+		self.assertEqual(apply_combo(promo, items_by_code), (0, 0))
+
+		items_by_code["ENTR-GRAL"][0].qty = 3
+		items_by_code["GASEOSA"][0].qty = 3
+
+		# 3 combos reach the minimum and each gives its drink away
+		self.assertEqual(apply_combo(promo, items_by_code), (300, 3))
@@ -0,0 +1,34 @@
+import click
+from frappe.commands import get_site, pass_context
+
+
+@click.command("promo-engine-benchmark")
+@click.option("--profile", default="smoke", type=click.Choice(["smoke", "full"]))
+@click.option("--threshold", type=float, help="Allowed timing regression as a fraction (default 0.30)")
+@click.option("--update-baseline", is_flag=True, help="Overwrite the stored baseline with this run")
+@pass_context
+def promo_engine_benchmark(context, profile, threshold, update_baseline):
+	"""
+	Runs the promo engine benchmarks against the site baseline; exits with an
+	error when a timing or query count regresses.
+	"""
+	import frappe
+
+	from acuamania.acuamania.promo_engine.benchmarks import run_benchmarks
+
+	frappe.init(site=get_site(context))
+	frappe.connect()
+	try:
+		if threshold is None:
+			threshold = frappe.conf.get("promo_engine_benchmark_threshold")
+
+		report = run_benchmarks(profile, update_baseline=update_baseline, threshold=threshold)
+		if report.get("baseline_written"):
+			click.echo(f"Baseline written to {report['baseline_written']}")
+		else:
+			click.echo(f"No regressions in profile '{profile}'")
+	finally:
+		frappe.destroy()
+
+
+commands = [promo_engine_benchmark]
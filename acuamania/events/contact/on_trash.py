@@ -0,0 +1,7 @@
+from acuamania.acuamania.promo_engine.audiences import clear_party_categories
+from acuamania.utils.phone import clear_contact_phone_cache
+
+
+def on_trash(doc, method=None):
+	clear_party_categories(doc.doctype, doc.name)
+	clear_contact_phone_cache(doc)
@@ -1,7 +1,11 @@
 import frappe
 
+from acuamania.acuamania.promo_engine.audiences import update_party_categories
 from acuamania.events.contact.contact_propagation.contact_propagation import contact_propagation
+from acuamania.utils.phone import clear_contact_phone_cache
 
 
 def on_update(doc, method=None):
+	update_party_categories(doc)
+	clear_contact_phone_cache(doc)
 	contact_propagation(doc)
@@ -0,0 +1,61 @@
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from acuamania.utils.phone import find_contact_by_phone, normalize_phone
+
+TEST_CONTACT_PHONE = "099 123 987"
+
+
+class TestNormalizePhone(FrappeTestCase):
+	def test_uruguay_formats_share_one_key(self):
+		for phone in (
+			"099123987",
+			"099 123 987",
+			"+598 99 123 987",
+			"00598 99123987",
+			"59899123987",
+			"+598 099 123 987",
+		):
+			self.assertEqual(normalize_phone(phone), "+59899123987", phone)
+
+	def test_landlines_and_other_countries(self):
+		self.assertEqual(normalize_phone("2901 1234"), "+59829011234")
+		self.assertEqual(normalize_phone("+54 11 5555 1234"), "+541155551234")
+		self.assertEqual(normalize_phone("  "), "")
+		self.assertEqual(normalize_phone(None), "")
+
+
+class TestFindContactByPhone(FrappeTestCase):
+	def setUp(self):
+		self.contact = frappe.get_doc(
+			{"doctype": "Contact", "first_name": "Telefono", "phone": TEST_CONTACT_PHONE}
+		).insert(ignore_permissions=True)
+
+	def tearDown(self):
+		frappe.delete_doc_if_exists("Contact", self.contact.name, force=True)
+
+	def test_any_format_finds_the_contact(self):
+		self.assertEqual(find_contact_by_phone("+598 99 123 987"), self.contact.name)
+		self.assertEqual(find_contact_by_phone("099123987"), self.contact.name)
+
+	def test_phone_change_refreshes_the_lookup(self):
+		self.assertEqual(find_contact_by_phone(TEST_CONTACT_PHONE), self.contact.name)
+
+		self.contact.phone = "099 000 111"
+		self.contact.custom_phone = "099 000 111"
+		self.contact.save(ignore_permissions=True)
+
+		self.assertIsNone(find_contact_by_phone(TEST_CONTACT_PHONE))
+		self.assertEqual(find_contact_by_phone("+59899000111"), self.contact.name)
+
+	def test_rollback_drops_uncommitted_lookup(self):
+		phone = "099 321 654"
+		contact = frappe.get_doc({"doctype": "Contact", "first_name": "Temporal", "phone": phone}).insert(
+			ignore_permissions=True
+		)
+		self.assertEqual(find_contact_by_phone(phone), contact.name)
+
+		frappe.db.rollback()
+
+		self.assertFalse(frappe.db.exists("Contact", contact.name))
+		self.assertIsNone(find_contact_by_phone(phone))
@@ -1,17 +1,17 @@
 import frappe
-from frappe import _
 
+from acuamania.utils.phone import NORMALIZED_PHONE_FIELD
 
-def validate_no_duplicate_contact(doc, method=None):
+MSG_DUPLICATE_PHONE = "Ya existe un contacto con este número telefónico."
+
+
+def is_duplicate_phone_error(exc):
 	"""
-	Validate that there are no duplicate contacts with the same phone number
+	True when a database error is a violation of the unique index on
+	Contact.custom_phone_normalized.
 	"""
-	if not doc.phone:
-		return
+	return frappe.db.is_unique_key_violation(exc) and NORMALIZED_PHONE_FIELD in str(exc)
 
-	existing_contact = frappe.db.exists("Contact", {"phone": doc.phone, "name": ("!=", doc.name)})
 
-	if existing_contact:
-		frappe.throw(
-			_("A contact with phone number {0} already exists").format(doc.phone), frappe.DuplicateEntryError
-		)
+def throw_duplicate_contact():
+	frappe.throw(MSG_DUPLICATE_PHONE, frappe.DuplicateEntryError)
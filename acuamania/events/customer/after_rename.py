@@ -0,0 +1,6 @@
+from acuamania.acuamania.promo_engine.audiences import clear_party_categories
+
+
+def after_rename(doc, method=None, old_name=None, new_name=None, merge=False):
+	clear_party_categories(doc.doctype, old_name)
+	clear_party_categories(doc.doctype, new_name)
@@ -0,0 +1,5 @@
+from acuamania.acuamania.promo_engine.audiences import update_party_categories
+
+
+def on_update(doc, method=None):
+	update_party_categories(doc)
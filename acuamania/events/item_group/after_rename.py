@@ -0,0 +1,5 @@
+from acuamania.acuamania.promo_engine.item_groups import clear_item_group_tree_cache
+
+
+def after_rename(doc, method=None, old_name=None, new_name=None, merge=False):
+	clear_item_group_tree_cache()
@@ -0,0 +1,5 @@
+from acuamania.acuamania.promo_engine.item_groups import clear_item_group_tree_cache
+
+
+def on_trash(doc, method=None):
+	clear_item_group_tree_cache()
@@ -0,0 +1,5 @@
+from acuamania.acuamania.promo_engine.item_prices import clear_item_price_cache
+
+
+def on_trash(doc, method=None):
+	clear_item_price_cache(doc.price_list)
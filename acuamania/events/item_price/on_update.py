@@ -0,0 +1,9 @@
+from acuamania.acuamania.promo_engine.item_prices import clear_item_price_cache
+
+
+def on_update(doc, method=None):
+	clear_item_price_cache(doc.price_list)
+
+	before = doc.get_doc_before_save()
+	if before and before.price_list != doc.price_list:
+		clear_item_price_cache(before.price_list)
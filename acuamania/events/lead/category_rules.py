@@ -0,0 +1,180 @@
+import operator
+
+import frappe
+from frappe.utils import cstr, flt
+
+from acuamania.utils.cache import clear_cached_values, get_cache_version, get_cached_value
+from acuamania.utils.phone import find_contact_by_phone
+from acuamania.utils.territories import is_resident_territory
+
+CATEGORY_RULES_NAMESPACE = "acuamania:customer_category_rules"
+
+COMPARISONS = {
+	"=": operator.eq,
+	"!=": operator.ne,
+	">": operator.gt,
+	">=": operator.ge,
+	"<": operator.lt,
+	"<=": operator.le,
+}
+
+VALUE_TESTS = {
+	"is set": bool,
+	"is not set": operator.not_,
+	"resident territory": is_resident_territory,
+	"existing contact": lambda phone: bool(find_contact_by_phone(phone)),
+}
+
+_compiled_rules = {}
+
+
+class CategoryRule:
+	"""
+	One compiled Customer Category rule: predicate(doc) tells whether a Lead
+	belongs to the category.
+	"""
+
+	__slots__ = ("category", "exclusivity_group", "fields", "on_insert_only", "predicate")
+
+	def __init__(self, category, fields, predicate, exclusivity_group=None, on_insert_only=False):
+		self.category = category
+		self.fields = fields
+		self.predicate = predicate
+		self.exclusivity_group = exclusivity_group
+		self.on_insert_only = on_insert_only
+
+	def __repr__(self):
+		return f"CategoryRule({self.category!r})"
+
+
+def get_category_rules():
+	"""
+	Compiled rules of every Customer Category with rule_enabled, by priority.
+
+	The rule rows are cached per process and in Redis (see utils.cache); the
+	predicates are compiled once per worker and rebuilt when a Customer
+	Category changes.
+	"""
+	version = get_cache_version(CATEGORY_RULES_NAMESPACE)
+	key = (frappe.local.site, version)
+
+	rules = _compiled_rules.get(key)
+	if rules is None:
+		definitions = get_cached_value(CATEGORY_RULES_NAMESPACE, "rules", _load_rule_definitions)
+		rules = tuple(compile_rule(*definition) for definition in definitions)
+
+		for stale_key in [stale_key for stale_key in _compiled_rules if stale_key[0] == key[0]]:
+			del _compiled_rules[stale_key]
+		_compiled_rules[key] = rules
+
+	return rules
+
+
+def clear_category_rules():
+	clear_cached_values(CATEGORY_RULES_NAMESPACE)
+
+
+def classify(doc, rules):
+	"""
+	Categories whose rule holds for doc, in rule order; within an
+	exclusivity group only the first matching category is kept.
+	"""
+	categories = []
+	taken_groups = set()
+
+	for rule in rules:
+		if rule.exclusivity_group and rule.exclusivity_group in taken_groups:
+			continue
+
+		if rule.predicate(doc):
+			categories.append(rule.category)
+			if rule.exclusivity_group:
+				taken_groups.add(rule.exclusivity_group)
+
+	return categories
+
+
+def compile_rule(category, fieldname, rule_operator, value, exclusivity_group=None, on_insert_only=0):
+	"""
+	Builds the CategoryRule of one Customer Category definition.
+
+	fieldname may list several Lead fields separated by commas: the first one
+	with a value is used. Comparisons are numeric when the rule value is a
+	number and textual otherwise.
+	"""
+	fields = tuple(field.strip() for field in cstr(fieldname).split(",") if field.strip())
+	read = _field_reader(fields)
+
+	if rule_operator in VALUE_TESTS:
+		predicate = _value_test(read, VALUE_TESTS[rule_operator])
+	elif rule_operator in COMPARISONS:
+		predicate = _comparison(read, COMPARISONS[rule_operator], value)
+	else:
+		frappe.throw(f"Unknown rule operator '{rule_operator}' on Customer Category '{category}'")
+
+	return CategoryRule(category, fields, predicate, exclusivity_group or None, bool(on_insert_only))
+
+
+def _value_test(read, test):
+	def predicate(doc):
+		return test(read(doc))
+
+	return predicate
+
+
+def _comparison(read, compare, value):
+	value = cstr(value).strip()
+
+	try:
+		target = float(value)
+	except ValueError:
+
+		def predicate(doc):
+			return compare(cstr(read(doc)).strip(), value)
+
+	else:
+
+		def predicate(doc):
+			return compare(flt(read(doc)), target)
+
+	return predicate
+
+
+def _field_reader(fields):
+	def read(doc):
+		for fieldname in fields:
+			value = doc.get(fieldname)
+			if value:
+				return value
+		return None
+
+	return read
+
+
+def _load_rule_definitions():
+	rows = frappe.get_all(
+		"Customer Category",
+		filters={"rule_enabled": 1},
+		fields=[
+			"name",
+			"rule_field",
+			"rule_operator",
+			"rule_value",
+			"exclusivity_group",
+			"rule_on_insert_only",
+		],
+		order_by="rule_priority asc, name asc",
+	)
+
+	return [
+		(
+			row.name,
+			row.rule_field,
+			row.rule_operator,
+			row.rule_value,
+			row.exclusivity_group,
+			row.rule_on_insert_only,
+		)
+		for row in rows
+		if row.rule_field
+	]
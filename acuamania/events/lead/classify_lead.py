@@ -1,124 +1,74 @@
 import frappe
 
-STATUS_CATEGORIES = {"Nuevo", "Recurrente"}
-RESIDENT_CATEGORY = "Residente"
-GROUP_CATEGORY = "Grupo"
-CORPORATE_CATEGORY = "Corporativo"
-HOTEL_CATEGORY = "Hotel"
+from acuamania.events.lead.category_rules import classify, get_category_rules
+
+CATEGORY_FIELD = "custom_customer_category"
 
 
 def classify_lead(doc):
 	"""
-	Classify Lead categories.
+	before_insert: applies every Customer Category rule, in one pass.
 	"""
-	classify_customer_status(doc)
-	classify_group(doc)
-	# classify_corporate(doc)
-	# classify_hotel(doc)
-	classify_resident(doc)
+	rules = get_category_rules()
+
+	apply_categories(doc, classify(doc, rules), {rule.category for rule in rules})
+	doc.flags.classification_signature = get_classification_signature(doc, rules)
 
 
 def classify_lead_before_save(doc):
 	"""
-	Classify Lead categories before save.
+	before_save: re-applies the rules that are not insert-only (the
+	Nuevo/Recurrente status is set on insert) when one of the Lead fields
+	they read changed since the document was loaded, or since classify_lead
+	ran on insert.
 	"""
-
 	if getattr(frappe.flags, "in_contact_propagation", False):
 		return
-	classify_group(doc)
-	# classify_corporate(doc)
-	# classify_hotel(doc)
-	classify_resident(doc)
-
 
-def classify_customer_status(doc):
-	"""
-	Clasifica como Nuevo/Recurrente.
-	Atomizado para ejecutarse desde cualquier hook.
-	"""
-	phone_number = (doc.phone or "").strip()
-	if not phone_number:
+	rules = get_category_rules()
+	signature = get_classification_signature(doc, rules)
+	if signature == get_previous_signature(doc, rules):
 		return
 
-	contact_exists = frappe.db.exists("Contact", {"phone": phone_number})
-	status = "Recurrente" if contact_exists else "Nuevo"
-
-	_apply_to_lead(doc, {status})
-
-
-def classify_group(doc):
-	custom_person_qty = getattr(doc, "custom_person_qty", 1)
-
-	if custom_person_qty > 1:
-		_apply_to_lead(doc, {GROUP_CATEGORY})
-
-	if custom_person_qty <= 1:
-		_remove_category(doc, GROUP_CATEGORY)
-
-
-def classify_corporate(doc):
-	is_corpo = getattr(doc, "is_corpo", 0)
-
-	if is_corpo:
-		_apply_to_lead(doc, {CORPORATE_CATEGORY})
-
-	if not is_corpo:
-		_remove_category(doc, CORPORATE_CATEGORY)
+	rules = [rule for rule in rules if not rule.on_insert_only]
+	apply_categories(doc, classify(doc, rules), {rule.category for rule in rules})
+	doc.flags.classification_signature = signature
 
 
-def classify_hotel(doc):
-	is_hotel = getattr(doc, "custom_has_hotel_voucher", 0)
-
-	if is_hotel:
-		_apply_to_lead(doc, {HOTEL_CATEGORY})
-
-	if not is_hotel:
-		_remove_category(doc, HOTEL_CATEGORY)
-
-
-def classify_resident(doc):
-	if _is_resident_territory(doc):
-		_apply_to_lead(doc, {RESIDENT_CATEGORY})
-
-	if not _is_resident_territory(doc):
-		_remove_category(doc, RESIDENT_CATEGORY)
+def apply_categories(doc, categories, managed):
+	"""
+	Makes the managed categories of the Lead exactly `categories`, in one
+	pass over the rows; other categories are left untouched. Returns True
+	when the rows changed.
+	"""
+	wanted = set(categories)
+	rows = doc.get(CATEGORY_FIELD) or []
 
+	kept = [row for row in rows if row.customer_category not in managed or row.customer_category in wanted]
+	present = {row.customer_category for row in kept}
+	missing = [category for category in categories if category not in present]
 
-def _is_resident_territory(doc):
-	territory = getattr(doc, "territory", None) or getattr(doc, "custom_territory", None)
-	if not territory:
+	if len(kept) == len(rows) and not missing:
 		return False
 
-	is_resident = frappe.db.get_value("Territory", territory, "custom_is_resident")
-	return bool(is_resident)
+	doc.set(CATEGORY_FIELD, kept)
+	for category in missing:
+		doc.append(CATEGORY_FIELD, {"customer_category": category})
 
+	return True
 
-def _apply_to_lead(lead_doc, categories):
-	for category in categories:
-		if category in STATUS_CATEGORIES:
-			_set_exclusive_status(lead_doc, category)
-		else:
-			_append_if_missing(lead_doc, category)
-
-
-def _set_exclusive_status(doc, status):
-	opposite = "Recurrente" if status == "Nuevo" else "Nuevo"
-
-	preserved = [r for r in doc.custom_customer_category if r.customer_category != opposite]
-
-	doc.set("custom_customer_category", preserved)
-
-	if not any(r.customer_category == status for r in preserved):
-		doc.append("custom_customer_category", {"customer_category": status})
 
+def get_classification_signature(doc, rules):
+	"""
+	Values of every Lead field the rules read.
+	"""
+	fields = sorted({fieldname for rule in rules for fieldname in rule.fields})
+	return tuple((fieldname, doc.get(fieldname)) for fieldname in fields)
 
-def _append_if_missing(doc, category):
-	existing = [r.customer_category for r in doc.custom_customer_category]
-	if category not in existing:
-		doc.append("custom_customer_category", {"customer_category": category})
 
+def get_previous_signature(doc, rules):
+	if doc.flags.get("classification_signature") is not None:
+		return doc.flags.classification_signature
 
-def _remove_category(doc, category_name):
-	for row in list(doc.custom_customer_category):
-		if row.customer_category == category_name:
-			doc.custom_customer_category.remove(row)
+	previous = doc.get_doc_before_save()
+	return get_classification_signature(previous, rules) if previous else None
@@ -0,0 +1,5 @@
+from acuamania.acuamania.promo_engine.audiences import clear_party_categories
+
+
+def on_trash(doc, method=None):
+	clear_party_categories(doc.doctype, doc.name)
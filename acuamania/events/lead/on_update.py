@@ -1,5 +1,7 @@
+from acuamania.acuamania.promo_engine.audiences import update_party_categories
 from acuamania.events.lead.propagate_classifications import propagate_classifications
 
 
 def on_update(doc, method=None):
+	update_party_categories(doc)
 	propagate_classifications(doc)
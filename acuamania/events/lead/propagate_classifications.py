@@ -1,5 +1,6 @@
 import frappe
 
+from acuamania.utils.phone import find_contact_by_phone
 from acuamania.utils.sync import with_sync_guard
 
 
@@ -13,7 +14,7 @@ def propagate_classifications(doc, method=None):
 	if not phone_number:
 		return
 
-	contact_name = frappe.db.get_value("Contact", {"phone": phone_number}, "name")
+	contact_name = find_contact_by_phone(phone_number)
 	if not contact_name:
 		return
 
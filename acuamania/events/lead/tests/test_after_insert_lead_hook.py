@@ -2,6 +2,8 @@ import frappe
 from frappe.tests.utils import FrappeTestCase
 from frappe.utils import random_string
 
+from acuamania.events.lead.upsert_contact import _create_new_contact
+
 CUSTOM_CONTACT_LINK_FIELD = "custom_contact_name"
 
 
@@ -105,3 +107,17 @@ class TestLeadContactCreation(FrappeTestCase):
 			first_contact_name,
 			"Second Lead should reuse the existing Contact with same phone.",
 		)
+
+	def test_contact_created_concurrently_is_reused(self):
+		"""When the insert hits the unique phone index, the committed Contact is returned."""
+		existing = frappe.get_doc(
+			{"doctype": "Contact", "first_name": "Primero", "phone": "099 777 333"}
+		).insert(ignore_permissions=True)
+		self.created_docs.append(("Contact", existing.name))
+
+		# the lead's lookup ran before the other request committed: insert directly
+		lead = frappe._dict(name="LEAD-CONCURRENTE", first_name="Segundo", phone="+598 99 777 333")
+		contact = _create_new_contact(lead, lead.phone)
+
+		self.assertEqual(contact.name, existing.name)
+		self.assertEqual(frappe.db.count("Contact", {"phone": ["in", ["099 777 333", "+598 99 777 333"]]}), 1)
@@ -0,0 +1,80 @@
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from acuamania.events.lead.category_rules import classify, compile_rule
+from acuamania.events.lead.classify_lead import apply_categories, classify_lead_before_save
+from acuamania.patches import seed_customer_category_rules
+
+GROUP_CATEGORY = "Grupo"
+
+
+def categories_of(doc):
+	return [row.customer_category for row in doc.custom_customer_category]
+
+
+class TestCategoryRules(FrappeTestCase):
+	def test_comparisons_and_field_fallback(self):
+		rules = [
+			compile_rule("Grupo", "custom_person_qty", ">", "1"),
+			compile_rule("Montevideo", "territory, custom_territory", "=", "Montevideo"),
+			compile_rule("Sin Teléfono", "phone", "is not set", None),
+		]
+
+		lead = frappe._dict(custom_person_qty=4, custom_territory="Montevideo", phone="099 000 333")
+
+		self.assertEqual(classify(lead, rules), ["Grupo", "Montevideo"])
+
+	def test_exclusivity_group_keeps_the_first_match(self):
+		rules = [
+			compile_rule("VIP", "custom_person_qty", ">=", "10", "Tamaño"),
+			compile_rule("Grupo", "custom_person_qty", ">", "1", "Tamaño"),
+		]
+
+		self.assertEqual(classify(frappe._dict(custom_person_qty=12), rules), ["VIP"])
+		self.assertEqual(classify(frappe._dict(custom_person_qty=3), rules), ["Grupo"])
+
+	def test_unknown_operator(self):
+		with self.assertRaises(frappe.ValidationError):
+			compile_rule("Grupo", "custom_person_qty", "between", "1")
+
+
+class TestClassifyLead(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		seed_customer_category_rules.execute()
+
+	def make_lead(self, **values):
+		lead = frappe.new_doc("Lead")
+		lead.update({"first_name": "Clasificación", "phone": "099 000 222", **values})
+		return lead
+
+	def test_rules_run_when_an_input_changes(self):
+		lead = self.make_lead(custom_person_qty=3)
+
+		classify_lead_before_save(lead)
+		self.assertIn(GROUP_CATEGORY, categories_of(lead))
+
+		lead.custom_person_qty = 1
+		classify_lead_before_save(lead)
+		self.assertNotIn(GROUP_CATEGORY, categories_of(lead))
+
+	def test_unchanged_inputs_skip_the_rules(self):
+		lead = self.make_lead(custom_person_qty=3)
+		classify_lead_before_save(lead)
+
+		lead.set("custom_customer_category", [])
+		classify_lead_before_save(lead)
+
+		self.assertEqual(categories_of(lead), [])
+
+	def test_only_managed_categories_are_touched(self):
+		lead = self.make_lead()
+		lead.append("custom_customer_category", {"customer_category": "Nuevo"})
+		lead.append("custom_customer_category", {"customer_category": GROUP_CATEGORY})
+
+		changed = apply_categories(lead, [], {GROUP_CATEGORY})
+
+		self.assertTrue(changed)
+		self.assertEqual(categories_of(lead), ["Nuevo"])
+		self.assertFalse(apply_categories(lead, [], {GROUP_CATEGORY}))
@@ -0,0 +1,33 @@
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from acuamania.utils.territories import get_resident_territories, is_resident_territory
+
+TEST_TERRITORY = "_Test Territorio Residente"
+
+
+class TestResidentTerritories(FrappeTestCase):
+	def setUp(self):
+		if not frappe.db.exists("Territory", TEST_TERRITORY):
+			frappe.get_doc(
+				{
+					"doctype": "Territory",
+					"territory_name": TEST_TERRITORY,
+					"parent_territory": "All Territories",
+					"custom_is_resident": 0,
+				}
+			).insert(ignore_permissions=True)
+
+	def test_territory_update_refreshes_the_cached_set(self):
+		self.assertFalse(is_resident_territory(TEST_TERRITORY))
+
+		territory = frappe.get_doc("Territory", TEST_TERRITORY)
+		territory.custom_is_resident = 1
+		territory.save(ignore_permissions=True)
+
+		self.assertIn(TEST_TERRITORY, get_resident_territories())
+		self.assertTrue(is_resident_territory(TEST_TERRITORY))
+
+	def test_missing_territory_is_not_resident(self):
+		self.assertFalse(is_resident_territory(None))
+		self.assertFalse(is_resident_territory("_Test Territorio Inexistente"))
@@ -4,12 +4,13 @@ import sys
 
 import frappe
 
+from acuamania.utils.phone import NORMALIZED_PHONE_FIELD, find_contact_by_phone, normalize_phone
+
 LEAD_DOCTYPE = "Lead"
 CONTACT_DOCTYPE = "Contact"
 
 CUSTOM_CONTACT_LINK_FIELD = "custom_contact_name"
 PHONE_FIELD = "phone"
-MOBILE_FIELD = "mobile_no"
 EMAIL_FIELD = "email_id"
 PHONE_CHILD_TABLE = "phone_nos"
 EMAIL_CHILD_TABLE = "email_ids"
@@ -88,10 +89,7 @@ def _get_existing_contact(phone):
 
 	logger.info(f"🔍 Searching Contact for phone '{phone}'")
 
-	contact_name = frappe.db.exists(CONTACT_DOCTYPE, {PHONE_FIELD: phone})
-
-	if not contact_name:
-		contact_name = frappe.db.exists(CONTACT_DOCTYPE, {MOBILE_FIELD: phone})
+	contact_name = find_contact_by_phone(phone)
 
 	if contact_name:
 		logger.info(MSG_EXISTING_CONTACT.format(name=contact_name))
@@ -100,6 +98,23 @@ def _get_existing_contact(phone):
 	return None
 
 
+def _get_committed_contact(phone):
+	"""
+	Returns the Contact another transaction committed for this phone, OR None.
+	Bypasses the lookup cache; the locking read sees the latest commit instead
+	of this transaction's snapshot.
+	"""
+	contact_name = frappe.db.get_value(
+		CONTACT_DOCTYPE, {NORMALIZED_PHONE_FIELD: normalize_phone(phone)}, "name", for_update=True
+	)
+
+	if contact_name:
+		get_logger().info(MSG_EXISTING_CONTACT.format(name=contact_name))
+		return frappe.get_doc(CONTACT_DOCTYPE, contact_name)
+
+	return None
+
+
 def _create_new_contact(doc, phone):
 	"""
 	Builds and inserts a new Contact based on Lead info.
@@ -129,6 +144,13 @@ def _create_new_contact(doc, phone):
 	try:
 		contact.insert(ignore_permissions=True)
 		contact.reload()
+	except frappe.DuplicateEntryError:
+		# another request created the Contact for this phone first (unique index)
+		existing = _get_committed_contact(phone)
+		if not existing:
+			raise
+		frappe.clear_last_message()
+		return existing
 	finally:
 		frappe.flags.skip_contact_to_lead_sync = previous_skip
 
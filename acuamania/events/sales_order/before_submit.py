@@ -0,0 +1,5 @@
+from acuamania.acuamania.promo_engine.redemptions import reserve_redemptions
+
+
+def before_submit(doc, method=None):
+	reserve_redemptions(doc)
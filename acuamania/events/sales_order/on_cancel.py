@@ -0,0 +1,5 @@
+from acuamania.acuamania.promo_engine.redemptions import release_redemptions
+
+
+def on_cancel(doc, method=None):
+	release_redemptions(doc)
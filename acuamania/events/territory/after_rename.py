@@ -0,0 +1,5 @@
+from acuamania.utils.territories import clear_resident_territories
+
+
+def after_rename(doc, method=None, old_name=None, new_name=None, merge=False):
+	clear_resident_territories()
@@ -0,0 +1,5 @@
+from acuamania.utils.territories import clear_resident_territories
+
+
+def on_trash(doc, method=None):
+	clear_resident_territories()
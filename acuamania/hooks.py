@@ -164,9 +164,9 @@ doctype_js = {"Opportunity": "public/js/opportunity.js"}
 # ---------------
 # Override standard doctype classes
 
-# override_doctype_class = {
-# 	"ToDo": "custom_app.overrides.CustomToDo"
-# }
+override_doctype_class = {
+	"Contact": "acuamania.overrides.contact.AcuamaniaContact",
+}
 
 # Document Events
 # ---------------
@@ -179,19 +179,43 @@ doc_events = {
 		"after_insert": "acuamania.events.lead.after_insert.after_insert",
 		"before_insert": "acuamania.events.lead.before_insert.before_insert",
 		"before_save": "acuamania.events.lead.before_save.before_save",
+		"on_trash": "acuamania.events.lead.on_trash.on_trash",
+		"after_rename": "acuamania.events.lead.after_rename.after_rename",
 	},
 	"Contact": {
 		"before_save": "acuamania.events.contact.before_save.before_save",
 		"on_update": "acuamania.events.contact.on_update.on_update",
-		"before_insert": "acuamania.events.contact.before_insert.before_insert",
+		"on_trash": "acuamania.events.contact.on_trash.on_trash",
+		"after_rename": "acuamania.events.contact.after_rename.after_rename",
+	},
+	"Customer": {
+		"on_update": "acuamania.events.customer.on_update.on_update",
+		"on_trash": "acuamania.events.customer.on_trash.on_trash",
+		"after_rename": "acuamania.events.customer.after_rename.after_rename",
 	},
 	"Sales Order": {
 		"before_save": "acuamania.events.sales_order.before_save.before_save",
+		"before_submit": "acuamania.events.sales_order.before_submit.before_submit",
 		"on_submit": "acuamania.events.sales_order.on_submit.on_submit",
+		"on_cancel": "acuamania.events.sales_order.on_cancel.on_cancel",
 	},
 	"Quotation": {
 		"before_save": "acuamania.events.quotation.before_save.before_save",
 	},
+	"Item Group": {
+		"on_update": "acuamania.events.item_group.on_update.on_update",
+		"on_trash": "acuamania.events.item_group.on_trash.on_trash",
+		"after_rename": "acuamania.events.item_group.after_rename.after_rename",
+	},
+	"Territory": {
+		"on_update": "acuamania.events.territory.on_update.on_update",
+		"on_trash": "acuamania.events.territory.on_trash.on_trash",
+		"after_rename": "acuamania.events.territory.after_rename.after_rename",
+	},
+	"Item Price": {
+		"on_update": "acuamania.events.item_price.on_update.on_update",
+		"on_trash": "acuamania.events.item_price.on_trash.on_trash",
+	},
 	# "Sales Invoice": {
 	# 	"on_submit": "acuamania.events.sales_invoice.on_submit.on_submit",
 	# },
@@ -205,7 +229,10 @@ scheduler_events = {
 	# "all": [
 	# 	"acuamania.tasks.all"
 	# ],
-	"daily": ["acuamania.tasks.daily.save_transcriptions.save_transcriptions"],
+	"daily": [
+		"acuamania.tasks.daily.save_transcriptions.save_transcriptions",
+		"acuamania.acuamania.promo_engine.redemptions.reconcile_redemption_counts",
+	],
 	# "hourly": [
 	# 	"acuamania.tasks.hourly"
 	# ],
@@ -0,0 +1,20 @@
+from frappe.contacts.doctype.contact.contact import Contact
+
+from acuamania.events.contact.validate_no_duplicate_contact import (
+	is_duplicate_phone_error,
+	throw_duplicate_contact,
+)
+
+
+class AcuamaniaContact(Contact):
+	"""
+	Duplicate phones are rejected by the unique index on
+	custom_phone_normalized (no pre-check query); its violation is reported
+	as a DuplicateEntryError with the Spanish message.
+	"""
+
+	def show_unique_validation_message(self, e):
+		if is_duplicate_phone_error(e):
+			throw_duplicate_contact()
+
+		super().show_unique_validation_message(e)
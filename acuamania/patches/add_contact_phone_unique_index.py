@@ -0,0 +1,49 @@
+import frappe
+
+from acuamania.utils.cache import clear_cached_values
+from acuamania.utils.phone import CONTACT_PHONE_NAMESPACE, NORMALIZED_PHONE_FIELD
+
+DOCTYPE = "Contact"
+
+
+def execute():
+	"""
+	Makes Contact.custom_phone_normalized unique, backed by a database index.
+
+	Existing duplicates are resolved first: the oldest contact keeps the
+	normalized phone, the newer ones lose it (their phone is untouched) and
+	are logged so they can be merged.
+
+	Errors are not caught: a failed migration must stop the deploy.
+	"""
+	for phone in get_duplicate_phones():
+		names = frappe.get_all(
+			DOCTYPE, filters={NORMALIZED_PHONE_FIELD: phone}, order_by="creation asc", pluck="name"
+		)
+		for name in names[1:]:
+			frappe.db.set_value(DOCTYPE, name, NORMALIZED_PHONE_FIELD, None, update_modified=False)
+
+		frappe.log_error(
+			message=f"{phone}: {', '.join(names)} (se conserva {names[0]})",
+			title="Contactos duplicados por teléfono",
+		)
+
+	custom_field = frappe.get_doc("Custom Field", {"dt": DOCTYPE, "fieldname": NORMALIZED_PHONE_FIELD})
+	if not custom_field.unique:
+		custom_field.unique = 1
+		custom_field.save(ignore_permissions=True)
+
+	frappe.db.commit()
+	clear_cached_values(CONTACT_PHONE_NAMESPACE)
+	frappe.logger().info(f"✅ Unique index on {DOCTYPE}.{NORMALIZED_PHONE_FIELD}.")
+
+
+def get_duplicate_phones():
+	return frappe.db.sql_list(
+		f"""
+		select `{NORMALIZED_PHONE_FIELD}` from `tabContact`
+		where ifnull(`{NORMALIZED_PHONE_FIELD}`, '') != ''
+		group by `{NORMALIZED_PHONE_FIELD}`
+		having count(*) > 1
+		"""
+	)
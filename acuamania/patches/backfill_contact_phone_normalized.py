@@ -0,0 +1,28 @@
+import frappe
+
+from acuamania.utils.cache import clear_cached_values
+from acuamania.utils.phone import CONTACT_PHONE_NAMESPACE, NORMALIZED_PHONE_FIELD, normalize_phone
+
+DOCTYPE = "Contact"
+
+
+def execute():
+	"""
+	Fills custom_phone_normalized on existing contacts (phone, or mobile_no
+	when the contact has no phone) so lookups by phone hit the index.
+
+	The column is not unique yet: duplicates are resolved afterwards by
+	add_contact_phone_unique_index, which then turns uniqueness on.
+	"""
+	contacts = frappe.get_all(DOCTYPE, fields=["name", "phone", "mobile_no", NORMALIZED_PHONE_FIELD])
+
+	for contact in contacts:
+		normalized = normalize_phone(contact.phone or contact.mobile_no) or None
+		if contact.get(NORMALIZED_PHONE_FIELD) != normalized:
+			frappe.db.set_value(
+				DOCTYPE, contact.name, NORMALIZED_PHONE_FIELD, normalized, update_modified=False
+			)
+
+	frappe.db.commit()
+	clear_cached_values(CONTACT_PHONE_NAMESPACE)
+	frappe.logger().info(f"✅ Normalized phone set on {len(contacts)} contacts.")
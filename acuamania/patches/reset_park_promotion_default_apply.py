@@ -0,0 +1,17 @@
+import frappe
+
+DOCTYPE = "Park Promotion"
+
+
+def execute():
+	"""
+	'Aplicar por Defecto' used to default to 1 without any effect. Now that the
+	promo engine auto-applies those promotions, start every existing promotion
+	opted out so nothing is applied without an explicit choice.
+	"""
+	try:
+		frappe.db.set_value(DOCTYPE, {"default_apply": 1}, "default_apply", 0, update_modified=False)
+		frappe.db.commit()
+		frappe.logger().info(f"✅ 'default_apply' reset on every {DOCTYPE}.")
+	except Exception as e:
+		frappe.log_error(message=str(e), title=f"{DOCTYPE} default_apply Patch Failed")
@@ -0,0 +1,42 @@
+import frappe
+
+from acuamania.events.lead.category_rules import clear_category_rules
+from acuamania.patches.load_customer_categories import FILE_PATH, load_nomenclator
+
+DOCTYPE = "Customer Category"
+RULE_FIELDS = (
+	"rule_enabled",
+	"rule_field",
+	"rule_operator",
+	"rule_value",
+	"exclusivity_group",
+	"rule_priority",
+	"rule_on_insert_only",
+)
+
+
+def execute():
+	"""
+	Lead classification used to be hard-coded in classify_lead.py; seed the
+	same behaviour as Customer Category rules (Corporativo and Hotel stay
+	disabled, as they were commented out). Categories that already have a
+	rule are left as configured.
+	"""
+	try:
+		for entry in load_nomenclator(FILE_PATH):
+			name = entry["customer_category"]
+			if not frappe.db.exists(DOCTYPE, name) or frappe.db.get_value(DOCTYPE, name, "rule_field"):
+				continue
+
+			frappe.db.set_value(
+				DOCTYPE,
+				name,
+				{fieldname: entry.get(fieldname) for fieldname in RULE_FIELDS if fieldname in entry},
+				update_modified=False,
+			)
+
+		frappe.db.commit()
+		clear_category_rules()
+		frappe.logger().info(f"✅ '{DOCTYPE}' classification rules seeded.")
+	except Exception as e:
+		frappe.log_error(message=str(e), title=f"{DOCTYPE} rules Patch Failed")
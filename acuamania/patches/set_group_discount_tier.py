@@ -0,0 +1,28 @@
+import frappe
+
+from acuamania.acuamania.promo_engine.active_promotions import clear_active_promotion_index
+
+DOCTYPE = "Park Promotion"
+GROUP_PROMO_LABEL = "Descuento de Grupo"
+GROUP_PROMO_MIN_QTY = 16
+
+
+def execute():
+	"""
+	'Descuento de Grupo' used to be hard-coded for more than 15 Entradas.
+	Group discounts are now tiers configured on Park Promotion; keep the old
+	behaviour by making it the 16+ tier.
+	"""
+	try:
+		frappe.db.set_value(
+			DOCTYPE,
+			{"promotion_name": GROUP_PROMO_LABEL, "group_min_qty": ["in", [0, None]]},
+			"group_min_qty",
+			GROUP_PROMO_MIN_QTY,
+			update_modified=False,
+		)
+		frappe.db.commit()
+		clear_active_promotion_index()
+		frappe.logger().info(f"✅ '{GROUP_PROMO_LABEL}' set as the {GROUP_PROMO_MIN_QTY}+ group tier.")
+	except Exception as e:
+		frappe.log_error(message=str(e), title=f"{DOCTYPE} group tier Patch Failed")
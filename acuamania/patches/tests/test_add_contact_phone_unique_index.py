@@ -0,0 +1,40 @@
+import unittest
+
+import frappe
+
+from acuamania.events.contact.validate_no_duplicate_contact import MSG_DUPLICATE_PHONE
+from acuamania.patches import add_contact_phone_unique_index as patch
+from acuamania.utils.phone import NORMALIZED_PHONE_FIELD
+
+TEST_PHONE = "099 555 010"
+
+
+class TestAddContactPhoneUniqueIndex(unittest.TestCase):
+	def setUp(self):
+		frappe.db.rollback()
+		self.contacts = []
+
+	def tearDown(self):
+		for name in self.contacts:
+			frappe.delete_doc_if_exists("Contact", name, force=True)
+		frappe.db.commit()
+
+	def make_contact(self, first_name, phone=TEST_PHONE):
+		contact = frappe.get_doc({"doctype": "Contact", "first_name": first_name, "phone": phone})
+		contact.insert(ignore_permissions=True)
+		self.contacts.append(contact.name)
+		return contact
+
+	def test_duplicate_phone_is_rejected_by_the_index(self):
+		patch.execute()
+		self.make_contact("Original")
+
+		with self.assertRaises(frappe.DuplicateEntryError) as context:
+			self.make_contact("Duplicado", phone="+598 99 555 010")
+
+		self.assertIn(MSG_DUPLICATE_PHONE, str(context.exception))
+		self.assertTrue(
+			frappe.db.get_value(
+				"Custom Field", {"dt": "Contact", "fieldname": NORMALIZED_PHONE_FIELD}, "unique"
+			)
+		)
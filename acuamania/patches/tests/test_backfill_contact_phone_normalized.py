@@ -0,0 +1,30 @@
+import unittest
+
+import frappe
+
+from acuamania.patches import backfill_contact_phone_normalized as patch
+from acuamania.utils.phone import NORMALIZED_PHONE_FIELD, find_contact_by_phone
+
+TEST_PHONE = "099 765 432"
+
+
+class TestBackfillContactPhoneNormalized(unittest.TestCase):
+	def setUp(self):
+		frappe.db.rollback()
+		self.contact = frappe.get_doc(
+			{"doctype": "Contact", "first_name": "Backfill", "phone": TEST_PHONE}
+		).insert(ignore_permissions=True)
+		frappe.db.set_value("Contact", self.contact.name, NORMALIZED_PHONE_FIELD, None, update_modified=False)
+		frappe.db.commit()
+
+	def tearDown(self):
+		frappe.delete_doc_if_exists("Contact", self.contact.name, force=True)
+		frappe.db.commit()
+
+	def test_patch_fills_the_normalized_phone(self):
+		patch.execute()
+
+		self.assertEqual(
+			frappe.db.get_value("Contact", self.contact.name, NORMALIZED_PHONE_FIELD), "+59899765432"
+		)
+		self.assertEqual(find_contact_by_phone("+598 99 765 432"), self.contact.name)
@@ -0,0 +1,32 @@
+import unittest
+
+import frappe
+
+from acuamania.patches import reset_park_promotion_default_apply as patch
+
+DOCTYPE = "Park Promotion"
+PROMO_NAME = "Test Default Apply Patch"
+
+
+class TestResetParkPromotionDefaultApply(unittest.TestCase):
+	def setUp(self):
+		frappe.db.rollback()
+		frappe.delete_doc_if_exists(DOCTYPE, PROMO_NAME, force=True)
+		frappe.get_doc(
+			{
+				"doctype": DOCTYPE,
+				"promotion_name": PROMO_NAME,
+				"apply_type": "porcentaje",
+				"discount_percentage": 5,
+				"default_apply": 1,
+			}
+		).insert(ignore_permissions=True)
+		frappe.db.commit()
+
+	def tearDown(self):
+		frappe.delete_doc_if_exists(DOCTYPE, PROMO_NAME, force=True)
+		frappe.db.commit()
+
+	def test_patch_clears_default_apply(self):
+		patch.execute()
+		self.assertEqual(frappe.db.get_value(DOCTYPE, PROMO_NAME, "default_apply"), 0)
@@ -0,0 +1,41 @@
+import unittest
+
+import frappe
+
+from acuamania.patches import set_group_discount_tier as patch
+
+DOCTYPE = "Park Promotion"
+
+
+class TestSetGroupDiscountTier(unittest.TestCase):
+	def setUp(self):
+		frappe.db.rollback()
+		self.created = False
+
+		if not frappe.db.exists(DOCTYPE, patch.GROUP_PROMO_LABEL):
+			frappe.get_doc(
+				{
+					"doctype": DOCTYPE,
+					"promotion_name": patch.GROUP_PROMO_LABEL,
+					"apply_type": "porcentaje",
+					"discount_percentage": 10,
+				}
+			).insert(ignore_permissions=True)
+			self.created = True
+
+		self.previous = frappe.db.get_value(DOCTYPE, patch.GROUP_PROMO_LABEL, "group_min_qty")
+		frappe.db.set_value(DOCTYPE, patch.GROUP_PROMO_LABEL, "group_min_qty", 0)
+		frappe.db.commit()
+
+	def tearDown(self):
+		if self.created:
+			frappe.delete_doc_if_exists(DOCTYPE, patch.GROUP_PROMO_LABEL, force=True)
+		else:
+			frappe.db.set_value(DOCTYPE, patch.GROUP_PROMO_LABEL, "group_min_qty", self.previous)
+		frappe.db.commit()
+
+	def test_patch_sets_the_16_tier(self):
+		patch.execute()
+		self.assertEqual(
+			frappe.db.get_value(DOCTYPE, patch.GROUP_PROMO_LABEL, "group_min_qty"), patch.GROUP_PROMO_MIN_QTY
+		)
@@ -0,0 +1,80 @@
+import frappe
+
+_process_cache = {}
+# entries kept per namespace in each worker; the least recently used go first
+MAX_PROCESS_ENTRIES = 1024
+
+
+def get_cached_value(namespace, key, generator):
+	"""
+	Two-level read-through cache: worker process memory first, then Redis, then generator().
+
+	Each namespace carries a version token in Redis; when it changes (see clear_cached_values)
+	every worker drops its in-process copy of that namespace on its next read. The version
+	token itself is read through frappe's request-local cache, so a request pays at most one
+	Redis round-trip per namespace.
+
+	Values that resolve to None are not cached. Each worker keeps at most
+	MAX_PROCESS_ENTRIES keys per namespace in memory, dropping the least recently
+	used; Redis keeps them all.
+	"""
+	entries = _get_process_entries(namespace)
+	if key in entries:
+		entries[key] = entries.pop(key)
+		return entries[key]
+
+	value = frappe.cache().hget(namespace, key)
+	if value is None:
+		value = generator()
+		if value is None:
+			return None
+		frappe.cache().hset(namespace, key, value)
+
+	entries[key] = value
+	if len(entries) > MAX_PROCESS_ENTRIES:
+		del entries[next(iter(entries))]
+	return value
+
+
+def clear_cached_values(namespace, key=None):
+	"""
+	Invalidates one key (or the whole namespace) in Redis and in every worker process.
+	"""
+	if key is None:
+		frappe.cache().delete_key(namespace)
+	else:
+		frappe.cache().hdel(namespace, key)
+
+	frappe.cache().set_value(_version_key(namespace), frappe.generate_hash(length=12))
+	_process_cache.pop(_process_key(namespace), None)
+
+
+def get_cache_version(namespace):
+	"""
+	Current version token of a namespace; changes whenever the namespace is invalidated.
+	"""
+	version = frappe.cache().get_value(_version_key(namespace))
+	if version is None:
+		version = frappe.generate_hash(length=12)
+		frappe.cache().set_value(_version_key(namespace), version)
+	return version
+
+
+def _get_process_entries(namespace):
+	version = get_cache_version(namespace)
+
+	cached = _process_cache.get(_process_key(namespace))
+	if not cached or cached["version"] != version:
+		cached = {"version": version, "entries": {}}
+		_process_cache[_process_key(namespace)] = cached
+
+	return cached["entries"]
+
+
+def _process_key(namespace):
+	# A bench worker serves several sites, so process entries are partitioned per site.
+	return (frappe.local.site, namespace)
+
+
+def _version_key(namespace):
+	return f"{namespace}:version"
@@ -0,0 +1,102 @@
+import re
+
+import frappe
+from frappe.utils import cstr
+
+from acuamania.utils.cache import clear_cached_values, get_cached_value
+
+CONTACT_PHONE_NAMESPACE = "acuamania:contact_by_phone"
+NORMALIZED_PHONE_FIELD = "custom_phone_normalized"
+URUGUAY_COUNTRY_CODE = "598"
+
+
+def normalize_phone(phone):
+	"""
+	Lookup key of a phone number: E.164 for Uruguay numbers, so that
+	"+598 99 111 222", "00598 99111222" and "099 111 222" are the same key.
+
+	    - 09XXXXXXX (mobile) and 2XXXXXXX / 4XXXXXXX (landline) get +598
+	    - 598XXXXXXXX and numbers with a 00 / + prefix keep their country code
+	    - anything else is returned as its digits
+
+	Returns "" for an empty phone.
+	"""
+	phone = cstr(phone).strip()
+	digits = re.sub(r"\D", "", phone)
+	if not digits:
+		return ""
+
+	international = phone.startswith("+")
+	if digits.startswith("00"):
+		digits = digits[2:]
+		international = True
+
+	if not international and len(digits) == 11 and digits.startswith(URUGUAY_COUNTRY_CODE):
+		international = True
+
+	if international:
+		# "+598 099 ..." keeps the national trunk 0 by mistake
+		if digits.startswith(f"{URUGUAY_COUNTRY_CODE}0") and len(digits) == 12:
+			digits = URUGUAY_COUNTRY_CODE + digits[4:]
+		return f"+{digits}"
+
+	if len(digits) == 9 and digits.startswith("0"):
+		return f"+{URUGUAY_COUNTRY_CODE}{digits[1:]}"
+
+	if len(digits) == 8 and digits[0] in "249":
+		return f"+{URUGUAY_COUNTRY_CODE}{digits}"
+
+	return digits
+
+
+def get_contact_phone(doc):
+	"""
+	Normalized phone of a Contact: phone, or mobile_no when it has none.
+	"""
+	return normalize_phone(doc.get("phone") or doc.get("mobile_no"))
+
+
+def find_contact_by_phone(phone):
+	"""
+	Name of the Contact with this phone in any format, or None.
+
+	One probe on the indexed custom_phone_normalized column, cached in the
+	worker process and in Redis (see utils.cache); Contact hooks drop the
+	entry when a contact's phone changes. A name read inside a transaction
+	may belong to a contact that is not committed yet, so the entry is
+	dropped again if that transaction rolls back.
+	"""
+	key = normalize_phone(phone)
+	if not key:
+		return None
+
+	return get_cached_value(CONTACT_PHONE_NAMESPACE, key, lambda: _load_contact_by_phone(key))
+
+
+def _load_contact_by_phone(key):
+	name = frappe.db.get_value("Contact", {NORMALIZED_PHONE_FIELD: key}, "name")
+	if name:
+		frappe.db.after_rollback.add(lambda: clear_cached_values(CONTACT_PHONE_NAMESPACE, key))
+	return name
+
+
+def set_normalized_phone(doc, method=None):
+	"""
+	Contact before_save: keeps custom_phone_normalized in sync.
+	"""
+	doc.set(NORMALIZED_PHONE_FIELD, get_contact_phone(doc) or None)
+
+
+def clear_contact_phone_cache(doc, method=None):
+	"""
+	Contact on_update / on_trash / after_rename: drops the cached lookups of
+	the contact's current and previous phone.
+	"""
+	keys = {get_contact_phone(doc)}
+
+	previous = doc.get_doc_before_save() if hasattr(doc, "get_doc_before_save") else None
+	if previous:
+		keys.add(get_contact_phone(previous))
+
+	for key in keys - {""}:
+		clear_cached_values(CONTACT_PHONE_NAMESPACE, key)
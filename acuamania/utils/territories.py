@@ -0,0 +1,26 @@
+import frappe
+
+from acuamania.utils.cache import clear_cached_values, get_cached_value
+
+RESIDENT_TERRITORY_NAMESPACE = "acuamania:resident_territories"
+RESIDENT_FIELD = "custom_is_resident"
+
+
+def get_resident_territories():
+	"""
+	Names of the Territories flagged custom_is_resident, loaded with one
+	query and cached per worker process and in Redis until a Territory changes.
+	"""
+	return get_cached_value(
+		RESIDENT_TERRITORY_NAMESPACE,
+		"all",
+		lambda: frozenset(frappe.get_all("Territory", filters={RESIDENT_FIELD: 1}, pluck="name")),
+	)
+
+
+def is_resident_territory(territory):
+	return bool(territory) and territory in get_resident_territories()
+
+
+def clear_resident_territories():
+	clear_cached_values(RESIDENT_TERRITORY_NAMESPACE)